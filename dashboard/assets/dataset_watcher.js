@@ -0,0 +1,57 @@
+// Polls the dataset version of the server on an interval and pushes changes
+// into the stores used by the data callbacks, so the browser only triggers
+// Dash callbacks when the data actually changed. The request only reads the
+// published state, it never holds a server thread.
+// keep in sync with data_managers/watcher_excel_dir.py and excel_manager.py
+(function () {
+  const ROUTE_DATASET_VERSION = "/_dataset/version";
+  const ID_PATH_STORE = "is-path-store";
+  const ID_STORE_DATE_WATCHER = "store-date-latest-fetch";
+  const DEFAULT_POLL_INTERVAL_MS = 2000;
+  const RETRY_DELAY_MS = 5000;
+
+  const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+  function pushState(state, previousState) {
+    const setProps = window.dash_clientside && window.dash_clientside.set_props;
+    if (!setProps) {
+      return;
+    }
+    if (state.path !== previousState.path) {
+      setProps(ID_PATH_STORE, { data: state.path });
+    }
+    setProps(ID_STORE_DATE_WATCHER, { data: state.modification_date });
+  }
+
+  async function watchDataset() {
+    let state = null;
+    let pollIntervalMs = DEFAULT_POLL_INTERVAL_MS;
+
+    while (true) {
+      try {
+        const response = await fetch(ROUTE_DATASET_VERSION, {
+          cache: "no-store",
+        });
+        if (!response.ok) {
+          throw new Error(`unexpected status ${response.status}`);
+        }
+        const newState = await response.json();
+
+        // the first answer only tells which version the page was built from
+        if (state && newState.version !== state.version) {
+          pushState(newState, state);
+        }
+        state = newState;
+        if (newState.poll_interval_seconds > 0) {
+          pollIntervalMs = newState.poll_interval_seconds * 1000;
+        }
+        await sleep(pollIntervalMs);
+      } catch (error) {
+        console.warn("Dataset watcher failed, retrying", error);
+        await sleep(RETRY_DELAY_MS);
+      }
+    }
+  }
+
+  window.addEventListener("load", watchDataset);
+})();
@@ -0,0 +1,126 @@
+"""Compare the Arrow IPC cache codec with pickle on cached analytics results.
+
+The frame has the shape of prepare_registration_family_data: one row per
+time window, registration and delay family. Run from the dashboard directory:
+
+    python benchmarks/bench_cache_codec.py --windows 365 --registrations 120
+"""
+
+import argparse
+import os
+import pickle
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import polars as pl
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_managers import cache_codec  # noqa: E402
+
+FAMILIES = ["Technique", "Avarie", "Autre", "Escale", "Equipage", "Meteo"]
+
+
+def build_registration_family_frame(
+    windows: int, registrations: int, seed: int
+) -> pl.DataFrame:
+    rng = np.random.default_rng(seed)
+
+    window_start = [date(2022, 1, 1) + timedelta(days=i) for i in range(windows)]
+    registration_names = [f"CN-R{i:03d}" for i in range(registrations)]
+
+    keys = (
+        pl.DataFrame({"WINDOW_DATETIME_DEP": window_start})
+        .join(pl.DataFrame({"AC_REGISTRATION": registration_names}), how="cross")
+        .join(pl.DataFrame({"FAMILLE_DR": FAMILIES}), how="cross")
+    )
+    # not every registration has every family of delay every day
+    keys = keys.filter(pl.Series(rng.random(keys.height) < 0.35))
+
+    counts = rng.integers(1, 20, keys.height).astype(np.uint32)
+    return (
+        keys.with_columns(
+            pl.col("AC_REGISTRATION").cast(pl.Categorical),
+            pl.col("FAMILLE_DR").cast(pl.Categorical),
+            pl.Series("count_per_registration_family", counts),
+            pl.col("WINDOW_DATETIME_DEP").alias("WINDOW_DATETIME_DEP_MAX"),
+        )
+        .with_columns(
+            pl.col("count_per_registration_family")
+            .sum()
+            .over(["WINDOW_DATETIME_DEP", "AC_REGISTRATION"])
+            .alias("period_total")
+        )
+        .with_columns(
+            (pl.col("count_per_registration_family") / pl.col("period_total") * 100)
+            .round(2)
+            .alias("pct_registration_family_vs_family_total")
+        )
+    )
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def encode_with(compression: str):
+    def encode(value):
+        cache_codec.codec_compression = compression
+        return cache_codec.encode_value(value)
+
+    return encode
+
+
+def report(label: str, value, repeat: int) -> None:
+    encoders = {"pickle": (pickle.dumps, pickle.loads)}
+    for compression in cache_codec.IPC_COMPRESSIONS:
+        encoders[f"ipc {compression}"] = (
+            encode_with(compression),
+            cache_codec.decode_value,
+        )
+
+    print(label)
+    for name, (dumps, loads) in encoders.items():
+        payload = dumps(value)
+        assert_same(value, loads(payload))
+
+        dump_time = timed(lambda: dumps(value), repeat)
+        load_time = timed(lambda: loads(payload), repeat)
+        print(
+            f"  {name:>16}: {len(payload) / 1024:9.1f} KiB, "
+            f"encode {dump_time * 1000:7.2f} ms, decode {load_time * 1000:7.2f} ms"
+        )
+
+
+def assert_same(expected, actual) -> None:
+    if isinstance(expected, tuple):
+        for expected_item, actual_item in zip(expected, actual, strict=True):
+            assert_same(expected_item, actual_item)
+    else:
+        assert expected.equals(actual)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--windows", type=int, default=365)
+    parser.add_argument("--registrations", type=int, default=120)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    df = build_registration_family_frame(args.windows, args.registrations, args.seed)
+    print(f"rows: {df.height}, in memory: {df.estimated_size() / 1024:.1f} KiB")
+
+    report("registration family frame", df, args.repeat)
+    report("tuple of two frames", (df, df.head(df.height // 10)), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Compare date window filtering with predicates and with the date index.
+
+Run from the dashboard directory:
+
+    python benchmarks/bench_date_index.py --years 5 --rows-per-day 2000
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import polars as pl
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_managers.date_index import DateIndex  # noqa: E402
+
+COL_NAME_DEPARTURE_DATETIME = "DEP_DAY_SCHED"
+
+
+def build_frame(years: int, rows_per_day: int, seed: int) -> pl.DataFrame:
+    rng = np.random.default_rng(seed)
+    days = years * 365
+    height = days * rows_per_day
+
+    start = date(2020, 1, 1)
+    return (
+        pl.DataFrame(
+            {
+                COL_NAME_DEPARTURE_DATETIME: pl.date_range(
+                    start, start + timedelta(days=days - 1), eager=True
+                ).gather(np.sort(rng.integers(0, days, height))),
+                "DELAY_CODE": rng.choice([41, 42, 46, 51, 52], height).astype(
+                    np.int32
+                ),
+                "DELAY_TIME": rng.integers(0, 240, height),
+            }
+        )
+        .sort(COL_NAME_DEPARTURE_DATETIME)
+    )
+
+
+def predicate_window(df: pl.DataFrame, start: date, end: date) -> pl.DataFrame:
+    return (
+        df.lazy()
+        .filter(pl.col(COL_NAME_DEPARTURE_DATETIME) >= start)
+        .filter(pl.col(COL_NAME_DEPARTURE_DATETIME) <= end)
+        .collect()
+    )
+
+
+def index_window(index: DateIndex, start: date, end: date) -> pl.DataFrame:
+    return index.slice(start, end)
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--rows-per-day", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    df = build_frame(args.years, args.rows_per_day, args.seed)
+    first_day = df.get_column(COL_NAME_DEPARTURE_DATETIME)[0]
+
+    t0 = time.perf_counter()
+    index = DateIndex(df, COL_NAME_DEPARTURE_DATETIME)
+    build_time = time.perf_counter() - t0
+
+    print(f"rows: {df.height}, days: {len(index.days)}")
+    print(f"index build: {build_time * 1000:.2f} ms")
+
+    windows = {
+        "1 week": 7,
+        "1 month": 30,
+        "1 year": 365,
+        "full range": args.years * 365,
+    }
+    for label, length in windows.items():
+        start = first_day + timedelta(days=(args.years * 365 - length) // 2)
+        end = start + timedelta(days=length - 1)
+
+        assert index_window(index, start, end).equals(
+            predicate_window(df, start, end)
+        )
+
+        predicate_time = timed(lambda: predicate_window(df, start, end), args.repeat)
+        index_time = timed(lambda: index_window(index, start, end), args.repeat)
+
+        print(
+            f"{label:>10}: predicate {predicate_time * 1000:8.2f} ms, "
+            f"index {index_time * 1000:8.3f} ms, "
+            f"x{predicate_time / max(index_time, 1e-9):.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
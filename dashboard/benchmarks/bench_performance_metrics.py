@@ -0,0 +1,207 @@
+"""Compare the performance metrics page calculation before and after the
+KPIs were fused into one pass over per-day totals.
+
+The current path is calculate_result of calculations.performance_metrics,
+run on a synthetic dataset loaded through the excel_manager preprocessing
+and daily cube. The previous path keeps the totals scan of the raw rows
+and the three aggregations joined one by one, as they were before.
+
+Run from the dashboard directory:
+
+    python benchmarks/bench_performance_metrics.py --years 5 --rows-per-day 2000
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import polars as pl
+from polars.testing import assert_frame_equal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calculations import performance_metrics  # noqa: E402
+from data_managers import excel_manager  # noqa: E402
+from data_managers.result_registry import result_registry  # noqa: E402
+
+COL_NAME_DEPARTURE_DATETIME = excel_manager.COL_NAME_DEPARTURE_DATETIME
+COL_NAME_WINDOW_TIME = excel_manager.COL_NAME_WINDOW_TIME
+COL_NAME_WINDOW_TIME_MAX = excel_manager.COL_NAME_WINDOW_TIME_MAX
+COL_NAME_TOTAL_COUNT = excel_manager.COL_NAME_TOTAL_COUNT
+COL_NAME_FLIGHT_COUNT = excel_manager.COL_NAME_FLIGHT_COUNT
+COL_NAME_DELAY_GT_15MIN = excel_manager.COL_NAME_DELAY_GT_15MIN
+
+BENCH_FILTERS = {
+    "all days": {},
+    "1 day windows": {"fl_segmentation": 1, "fl_unit_segmentation": "d"},
+    "1 week windows": {"fl_segmentation": 1, "fl_unit_segmentation": "w"},
+    "1 month windows": {"fl_segmentation": 1, "fl_unit_segmentation": "mo"},
+}
+
+
+def build_frame(years: int, rows_per_day: int, seed: int) -> pl.DataFrame:
+    rng = np.random.default_rng(seed)
+    days = years * 365
+    height = days * rows_per_day
+
+    start = date(2020, 1, 1)
+    registrations = np.array([f"CN-R{i:02d}" for i in range(60)])
+    airports = np.array([f"AP{i:02d}" for i in range(40)])
+    return pl.DataFrame(
+        {
+            "AC_REGISTRATION": registrations[rng.integers(0, 60, height)],
+            "AC_SUBTYPE": np.array(["A320", "A321", "B737", "B738", "E190"])[
+                rng.integers(0, 5, height)
+            ],
+            "DEP_AP_SCHED": airports[rng.integers(0, 40, height)],
+            COL_NAME_DEPARTURE_DATETIME: pl.date_range(
+                start, start + timedelta(days=days - 1), eager=True
+            ).gather(np.sort(rng.integers(0, days, height))),
+            # most flights leave on time
+            "DELAY_TIME": np.where(
+                rng.random(height) < 0.3, rng.integers(1, 240, height), 0
+            ),
+            "DELAY_CODE": rng.choice([41, 42, 46, 51, 52, 81, 93], height),
+            "FAMILLE_DR": np.array(["TECH", "OPS", "PAX"])[rng.integers(0, 3, height)],
+        }
+    )
+
+
+def load_dataset(raw: pl.DataFrame) -> None:
+    # the same preprocessing and daily cube as a loaded workbook
+    df_raw = excel_manager.materialize_base_df(
+        excel_manager.preprocess_df(raw.lazy())
+    )
+    df_unfiltered = excel_manager.materialize_base_df(
+        df_raw.lazy().pipe(excel_manager.filter_retard).pipe(excel_manager.filter_tec)
+    )
+    excel_manager.set_base_dfs(
+        df_raw, df_unfiltered, excel_manager.build_cube_df(df_unfiltered)
+    )
+
+
+def previous_count_df(filters: dict) -> pl.LazyFrame:
+    # get_count_df before user-021, it scans the raw rows of the window
+    segmentation = filters.get("fl_segmentation")
+    unit_segmentation = filters.get("fl_unit_segmentation")
+    stmt = excel_manager.get_date_index(excel_manager.df_raw).slice(None, None).lazy()
+
+    if segmentation and unit_segmentation:
+        min_segmentation = str(segmentation) + unit_segmentation
+        max_segmentation = str(segmentation - 1) + unit_segmentation
+        return (
+            stmt.with_columns(
+                pl.col(COL_NAME_DEPARTURE_DATETIME)
+                .dt.truncate(min_segmentation)
+                .alias(COL_NAME_WINDOW_TIME),
+            )
+            .group_by(COL_NAME_WINDOW_TIME)
+            .agg(pl.len().alias(COL_NAME_TOTAL_COUNT))
+            .with_columns(
+                pl.col(COL_NAME_WINDOW_TIME)
+                .dt.offset_by(max_segmentation)
+                .alias(COL_NAME_WINDOW_TIME_MAX),
+            )
+        )
+
+    return stmt.select(
+        pl.col(COL_NAME_DEPARTURE_DATETIME).min().alias(COL_NAME_WINDOW_TIME),
+        pl.col(COL_NAME_DEPARTURE_DATETIME).max().alias(COL_NAME_WINDOW_TIME_MAX),
+        pl.len().alias(COL_NAME_TOTAL_COUNT),
+    )
+
+
+def previous_calculate_result(filters: dict) -> pl.DataFrame:
+    # the filtered frames the registry collects, with the previous totals
+    filtered_df, _ = excel_manager.apply_filters(
+        excel_manager.df_unfiltered, filters, True
+    )
+    filtered_cube_df, _ = excel_manager.apply_filters(
+        excel_manager.df_cube_unfiltered, filters, True
+    )
+    filtered_df.collect()
+    df = filtered_cube_df.collect().lazy()
+    total_df = previous_count_df(filters).collect().lazy()
+
+    # calculate_graph_info_with_period before user-021, one join per count
+    delayed_15min_df = df.filter(pl.col(COL_NAME_DELAY_GT_15MIN))
+    counts = [
+        (df, performance_metrics.COL_NAME_TOTAL_COUNT_FLIGHT_WITH_DELAY),
+        (
+            delayed_15min_df,
+            performance_metrics.COL_NAME_TOTAL_COUNT_FLIGHT_WITH_DELAY_GTE_15MIN,
+        ),
+        (
+            delayed_15min_df.filter(pl.col("DELAY_CODE").is_in({41, 46})),
+            performance_metrics.COL_NAME_TOTAL_COUNT_FLIGHT_WITH_DELAY_41_46_GTE_15MIN,
+        ),
+    ]
+    joined_df = total_df
+    for frame, name in counts:
+        joined_df = joined_df.join(
+            frame.group_by(COL_NAME_WINDOW_TIME).agg(
+                pl.col(COL_NAME_FLIGHT_COUNT).sum().alias(name)
+            ),
+            COL_NAME_WINDOW_TIME,
+            how="left",
+        )
+
+    return (
+        joined_df.sort(COL_NAME_WINDOW_TIME)
+        .with_columns(performance_metrics.get_reliability_columns())
+        .collect()
+    )
+
+
+def current_calculate_result(filters: dict) -> pl.DataFrame:
+    # a cold registry, the filtered frames and totals are computed again
+    result_registry.clear()
+    return performance_metrics.calculate_result.__wrapped__(filters=filters)
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--rows-per-day", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    load_dataset(build_frame(args.years, args.rows_per_day, args.seed))
+    print(
+        f"raw rows: {excel_manager.df_raw.height}, "
+        f"cube rows: {excel_manager.df_cube_unfiltered.height}"
+    )
+
+    for label, filters in BENCH_FILTERS.items():
+        expected = previous_calculate_result(filters)
+        result = current_calculate_result(filters)
+        assert_frame_equal(
+            result.select(expected.columns), expected, check_dtypes=False
+        )
+
+        previous_time = timed(lambda: previous_calculate_result(filters), args.repeat)
+        current_time = timed(lambda: current_calculate_result(filters), args.repeat)
+
+        print(
+            f"{label:>16} ({expected.height} windows): "
+            f"previous {previous_time * 1000:8.2f} ms, "
+            f"current {current_time * 1000:8.2f} ms, "
+            f"x{previous_time / max(current_time, 1e-9):.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
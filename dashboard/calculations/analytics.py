@@ -1,12 +1,18 @@
+from typing import Optional
+
 from data_managers.cache_manager import cache_result
 from data_managers.excel_manager import (
+    COL_NAME_FLIGHT_COUNT,
     COL_NAME_WINDOW_TIME,
     COL_NAME_WINDOW_TIME_MAX,
-    get_df,
+    get_cube_df,
+    get_delay_code_dim,
 )
 
 import polars as pl
 
+from schemas.filter import FilterType
+
 COL_NAME_COUNT_DELAY_FAMILY = "count_delay_family"
 COL_NAME_COUNT_DELAY_PER_CODE_DELAY_PER_FAMILY = "count_delay_per_code_delay_per_family"
 COL_NAME_PERCENTAGE_FAMILY_PER_PERIOD = "perc_family_per_period"
@@ -23,9 +29,9 @@ COL_NAME_COUNT_FAMILY_TOTAL = "count_family_total"
 
 
 @cache_result("analytics_summary_data")
-def analyze_summery() -> pl.DataFrame:
+def analyze_summery(filters: Optional[FilterType] = None) -> pl.DataFrame:
 
-    frame = get_df().collect()
+    frame = get_cube_df(filters).collect()
 
     if frame.is_empty():
         return pl.DataFrame(
@@ -38,50 +44,48 @@ def analyze_summery() -> pl.DataFrame:
             }
         )
 
-    # First get airport counts per code
-    airport_counts = frame.group_by(["DELAY_CODE", "DEP_AP_SCHED"]).agg(
-        pl.len().alias("ap_count")
+    # airports of each code ranked by flights, busiest first
+    airport_summary = (
+        frame.group_by(["DELAY_CODE", "DEP_AP_SCHED"])
+        .agg(pl.col(COL_NAME_FLIGHT_COUNT).sum().alias("ap_count"))
+        .sort(
+            ["DELAY_CODE", "ap_count", "DEP_AP_SCHED"],
+            descending=[False, True, False],
+        )
+        .group_by("DELAY_CODE", maintain_order=True)
+        .agg(
+            # the previous summary listed a missing airport as None
+            pl.format(
+                "{} ({})",
+                pl.col("DEP_AP_SCHED").cast(pl.Utf8).fill_null("None"),
+                "ap_count",
+            )
+            .str.join(", ")
+            .alias("Aeroports")
+        )
     )
 
+    delay_code_dim = get_delay_code_dim()
+    if delay_code_dim is None or "LIB_CODE_DR" not in delay_code_dim.columns:
+        descriptions = pl.DataFrame(
+            schema={"DELAY_CODE": frame.schema["DELAY_CODE"], "Description": pl.Utf8}
+        )
+    else:
+        descriptions = delay_code_dim.select(
+            "DELAY_CODE", pl.col("LIB_CODE_DR").alias("Description")
+        )
+
     agg = (
         frame.group_by("DELAY_CODE")
         .agg(
             [
-                pl.len().alias("Occurrences"),
-                pl.col("LIB_CODE_DR").first().alias("Description"),
-                pl.col("DEP_AP_SCHED").drop_nulls().alias("AP_list"),
-            ]
-        )
-        .join(
-            airport_counts.group_by("DELAY_CODE").agg(
-                [
-                    pl.col("DEP_AP_SCHED").alias("airports"),
-                    pl.col("ap_count").alias("counts"),
-                ]
-            ),
-            on="DELAY_CODE",
-            how="left",
-        )
-        .with_columns(
-            [
-                pl.struct(["airports", "counts"])
-                .map_elements(
-                    lambda x: ", ".join(
-                        [
-                            f"{ap} ({cnt})"
-                            for ap, cnt in sorted(
-                                zip(x["airports"], x["counts"]),
-                                key=lambda item: item[1],
-                                reverse=True,
-                            )
-                        ]
-                    ),
-                    return_dtype=pl.Utf8,
-                )
-                .alias("Aeroports"),
-                pl.col("AP_list").list.n_unique().alias("Nb_AP"),
+                pl.col(COL_NAME_FLIGHT_COUNT).sum().alias("Occurrences"),
+                pl.col("DEP_AP_SCHED").drop_nulls().n_unique().alias("Nb_AP"),
             ]
         )
+        .join(airport_summary, on="DELAY_CODE", how="left")
+        # descriptions are joined on the few result rows, not carried per flight
+        .join(descriptions, on="DELAY_CODE", how="left")
         .select(["DELAY_CODE", "Occurrences", "Description", "Aeroports", "Nb_AP"])
         .sort("Occurrences", descending=True)
     )
@@ -89,8 +93,8 @@ def analyze_summery() -> pl.DataFrame:
 
 
 @cache_result("analytics_delay_code_data")
-def prepare_delay_data():
-    df = get_df()
+def prepare_delay_data(filters: Optional[FilterType] = None):
+    df = get_cube_df(filters)
     if df is None:
         return None, None
 
@@ -98,7 +102,9 @@ def prepare_delay_data():
 
     # Count per family + delay code
     temporal_all = df.group_by([COL_NAME_WINDOW_TIME, "FAMILLE_DR", "DELAY_CODE"]).agg(
-        pl.len().alias(COL_NAME_COUNT_DELAY_PER_CODE_DELAY_PER_FAMILY),
+        pl.col(COL_NAME_FLIGHT_COUNT)
+        .sum()
+        .alias(COL_NAME_COUNT_DELAY_PER_CODE_DELAY_PER_FAMILY),
         pl.col(COL_NAME_WINDOW_TIME_MAX).first().alias(COL_NAME_WINDOW_TIME_MAX),
     )
 
@@ -159,11 +165,11 @@ def prepare_delay_data():
 
 
 @cache_result("analytics_subtype_family_data")
-def prepare_subtype_family_data():
-    df = get_df().collect()
+def prepare_subtype_family_data(filters: Optional[FilterType] = None):
+    df = get_cube_df(filters).collect()
     # Count per FAMILLE_DR + AC_SUBTYPE per time window
     temporal_all = df.group_by([COL_NAME_WINDOW_TIME, "AC_SUBTYPE", "FAMILLE_DR"]).agg(
-        pl.len().alias(COL_NAME_COUNT_PER_SUBTYPE_FAMILY),
+        pl.col(COL_NAME_FLIGHT_COUNT).sum().alias(COL_NAME_COUNT_PER_SUBTYPE_FAMILY),
         pl.col(COL_NAME_WINDOW_TIME_MAX).first().alias(COL_NAME_WINDOW_TIME_MAX),
     )
 
@@ -189,15 +195,17 @@ def prepare_subtype_family_data():
 
 
 @cache_result("analytics_registration_family_data")
-def prepare_registration_family_data():
+def prepare_registration_family_data(filters: Optional[FilterType] = None):
 
-    df = get_df().collect()
+    df = get_cube_df(filters).collect()
 
     # Count per FAMILLE_DR + AC_REGISTRATION per time window
     temporal_all = df.group_by(
         [COL_NAME_WINDOW_TIME, "AC_REGISTRATION", "FAMILLE_DR"]
     ).agg(
-        pl.len().alias(COL_NAME_COUNT_PER_REGISTRATION_FAMILY),
+        pl.col(COL_NAME_FLIGHT_COUNT)
+        .sum()
+        .alias(COL_NAME_COUNT_PER_REGISTRATION_FAMILY),
         pl.col(COL_NAME_WINDOW_TIME_MAX).first().alias(COL_NAME_WINDOW_TIME_MAX),
     )
 
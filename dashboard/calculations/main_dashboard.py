@@ -1,8 +1,16 @@
+from typing import Optional
+
 import polars as pl
 
 from data_managers.cache_manager import cache_result
-from data_managers.excel_manager import COL_NAME_WINDOW_TIME, COL_NAME_WINDOW_TIME_MAX
-
+from data_managers.excel_manager import (
+    COL_NAME_DELAY_GT_15MIN,
+    COL_NAME_FLIGHT_COUNT,
+    COL_NAME_WINDOW_TIME,
+    COL_NAME_WINDOW_TIME_MAX,
+    get_cube_df,
+)
+from schemas.filter import FilterType
 
 COL_NAME_COUNT_FLIGHTS = "count of flights"
 COL_NAME_SUBTYPE = "AC_SUBTYPE"
@@ -18,11 +26,16 @@ COL_NAME_COUNT_FLIGHTS_REGISTRATION_PER_SUBTYPE = "count_of_flights_subtype"
 COL_NAME_COUNT_FLIGHTS_AIRPORT_PER_SUBTYPE = "count_of_flights_airport"
 
 
+# every function below takes the filtered daily cube, see get_cube_df,
+# the filters it was selected with only key the cached results. the cached
+# ones return collected frames, a cached plan would embed the whole cube
+
+
 def process_subtype_pct_data(df: pl.LazyFrame) -> pl.LazyFrame:
     # Step 1: group by window and subtype
     grouped = df.group_by(
         [COL_NAME_WINDOW_TIME, COL_NAME_WINDOW_TIME_MAX, "AC_SUBTYPE"]
-    ).agg(pl.count().alias(COL_NAME_COUNT_FLIGHTS))
+    ).agg(pl.col(COL_NAME_FLIGHT_COUNT).sum().alias(COL_NAME_COUNT_FLIGHTS))
 
     # Step 2: calculate the percentage by window
     result = grouped.with_columns(
@@ -40,36 +53,40 @@ def process_subtype_pct_data(df: pl.LazyFrame) -> pl.LazyFrame:
     return result.sort(COL_NAME_WINDOW_TIME)
 
 
-@cache_result("main_period_distribution")
+def get_cube_args(filters: FilterType) -> tuple:
+    # the frame the home page passes to the calculations below
+    return (get_cube_df(filters),)
+
+
+@cache_result("main_period_distribution", warm_args=get_cube_args)
 def calculate_period_distribution(
-    df: pl.LazyFrame | pl.DataFrame,
-) -> pl.LazyFrame | pl.DataFrame:
+    df: pl.LazyFrame, filters: Optional[FilterType] = None
+) -> pl.DataFrame:
     counts_df = (
         df.group_by([COL_NAME_WINDOW_TIME, COL_NAME_WINDOW_TIME_MAX])
-        .agg(pl.len().alias(COL_NAME_COUNT_PERIOD))
+        .agg(pl.col(COL_NAME_FLIGHT_COUNT).sum().alias(COL_NAME_COUNT_PERIOD))
         .sort(COL_NAME_WINDOW_TIME)
     )
-    total = counts_df[COL_NAME_COUNT_PERIOD].sum()
-    if total == 0:
-        return pl.DataFrame(
-            {
-                COL_NAME_WINDOW_TIME: [],
-                COL_NAME_COUNT_PERIOD: [],
-                COL_NAME_PERCENTAGE_DELAY: [],
-            }
+    total = pl.col(COL_NAME_COUNT_PERIOD).sum()
+    # no windows at all when no flight was counted
+    return (
+        counts_df.filter(total > 0)
+        .with_columns(
+            (pl.col(COL_NAME_COUNT_PERIOD) * 100 / total)
+            .round(2)
+            .alias(COL_NAME_PERCENTAGE_DELAY)
         )
-    return counts_df.with_columns(
-        (pl.col(COL_NAME_COUNT_PERIOD) * 100 / total)
-        .round(2)
-        .alias(COL_NAME_PERCENTAGE_DELAY)
+        .collect()
     )
 
 
-@cache_result("main_delay_pct")
-def calculate_delay_pct(df: pl.LazyFrame | pl.DataFrame) -> pl.LazyFrame | pl.DataFrame:
+@cache_result("main_delay_pct", warm_args=get_cube_args)
+def calculate_delay_pct(
+    df: pl.LazyFrame, filters: Optional[FilterType] = None
+) -> pl.DataFrame:
     # 1) Categorize delays
     df = df.with_columns(
-        pl.when(pl.col("DELAY_TIME") > 15)
+        pl.when(pl.col(COL_NAME_DELAY_GT_15MIN))
         .then(pl.lit("flights with delay > 15 min"))
         .otherwise(pl.lit("flights with delay ≤ 15 min"))
         .alias(COL_NAME_CATEGORY_GT_15MIN)
@@ -78,7 +95,7 @@ def calculate_delay_pct(df: pl.LazyFrame | pl.DataFrame) -> pl.LazyFrame | pl.Da
     # 2) Group by time window and delay category
     res = df.group_by(
         [COL_NAME_WINDOW_TIME, COL_NAME_WINDOW_TIME_MAX, COL_NAME_CATEGORY_GT_15MIN]
-    ).agg(pl.count().alias(COL_NAME_CATEGORY_GT_15MIN_COUNT))
+    ).agg(pl.col(COL_NAME_FLIGHT_COUNT).sum().alias(COL_NAME_CATEGORY_GT_15MIN_COUNT))
 
     # 3) Compute percentage per time window
     res = res.with_columns(
@@ -93,13 +110,13 @@ def calculate_delay_pct(df: pl.LazyFrame | pl.DataFrame) -> pl.LazyFrame | pl.Da
         .alias(COL_NAME_CATEGORY_GT_15MIN_MEAN)
     )
 
-    return res
+    return res.collect()
 
 
-@cache_result("main_subtype_registration_pct")
+@cache_result("main_subtype_registration_pct", warm_args=get_cube_args)
 def calculate_subtype_registration_pct(
-    df: pl.LazyFrame | pl.DataFrame,
-) -> pl.LazyFrame | pl.DataFrame:
+    df: pl.LazyFrame, filters: Optional[FilterType] = None
+) -> pl.DataFrame:
     # Step 1: group by subtype and registration
     grouped = df.group_by(
         [
@@ -108,7 +125,11 @@ def calculate_subtype_registration_pct(
             COL_NAME_SUBTYPE,
             "AC_REGISTRATION",
         ]
-    ).agg(pl.count().alias(COL_NAME_COUNT_FLIGHTS_REGISTRATION_PER_SUBTYPE))
+    ).agg(
+        pl.col(COL_NAME_FLIGHT_COUNT)
+        .sum()
+        .alias(COL_NAME_COUNT_FLIGHTS_REGISTRATION_PER_SUBTYPE)
+    )
 
     # Step 2: calculate percentage of each registration inside the subtype
     with_pct = grouped.with_columns(
@@ -125,13 +146,13 @@ def calculate_subtype_registration_pct(
 
     return with_pct.sort(
         [COL_NAME_SUBTYPE, COL_NAME_PERCENTAGE], descending=[False, True]
-    )
+    ).collect()
 
 
-@cache_result("main_subtype_airport_pct")
+@cache_result("main_subtype_airport_pct", warm_args=get_cube_args)
 def calculate_subtype_airport_pct(
-    df: pl.LazyFrame | pl.DataFrame,
-) -> pl.LazyFrame | pl.DataFrame:
+    df: pl.LazyFrame, filters: Optional[FilterType] = None
+) -> pl.DataFrame:
     # Step 1: group by subtype and scheduled departure airport
     grouped = df.group_by(
         [
@@ -140,7 +161,11 @@ def calculate_subtype_airport_pct(
             COL_NAME_SUBTYPE,
             "DEP_AP_SCHED",
         ]
-    ).agg(pl.count().alias(COL_NAME_COUNT_FLIGHTS_AIRPORT_PER_SUBTYPE))
+    ).agg(
+        pl.col(COL_NAME_FLIGHT_COUNT)
+        .sum()
+        .alias(COL_NAME_COUNT_FLIGHTS_AIRPORT_PER_SUBTYPE)
+    )
 
     # Step 2: calculate percentage of each airport inside the subtype
     with_pct = grouped.with_columns(
@@ -157,4 +182,4 @@ def calculate_subtype_airport_pct(
 
     return with_pct.sort(
         [COL_NAME_SUBTYPE, COL_NAME_PERCENTAGE], descending=[False, True]
-    )
+    ).collect()
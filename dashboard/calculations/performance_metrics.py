@@ -4,13 +4,18 @@ from server_instance import get_app
 import polars as pl
 
 from data_managers.excel_manager import (
-    get_df,
+    get_cube_df,
+    COL_NAME_DELAY_GT_15MIN,
+    COL_NAME_FLIGHT_COUNT,
     COL_NAME_TOTAL_COUNT,
     COL_NAME_WINDOW_TIME,
     get_total_df,
 )
 
 from data_managers.cache_manager import cache_result
+from schemas.filter import FilterType
+
+DELAY_CODES_41_46 = [41, 46]
 
 COL_NAME_TOTAL_COUNT_FLIGHT_WITH_DELAY = "flight_with_delay"
 COL_NAME_TOTAL_COUNT_FLIGHT_WITH_DELAY_GTE_15MIN = "flight_with_delay_gte_15min"
@@ -38,88 +43,93 @@ ID_CARD_DELAY_15MIN_41_46 = "card_delay_15min_41_46_metrics"
 app = get_app()
 
 
-def calculate_graph_info_with_period(df: pl.LazyFrame) -> pl.LazyFrame:
+def get_delay_count_aggs() -> list[pl.Expr]:
+    """Delayed flights of a group of the cube, null when none matches."""
+    is_delay_gt_15min = pl.col(COL_NAME_DELAY_GT_15MIN)
+    is_delay_41_46_gt_15min = is_delay_gt_15min & pl.col("DELAY_CODE").is_in(
+        DELAY_CODES_41_46
+    )
 
-    assert df is not None
-    ##
+    return [
+        pl.col(COL_NAME_FLIGHT_COUNT)
+        .sum()
+        .alias(COL_NAME_TOTAL_COUNT_FLIGHT_WITH_DELAY),
+        pl.when(is_delay_gt_15min.any())
+        .then(pl.col(COL_NAME_FLIGHT_COUNT).filter(is_delay_gt_15min).sum())
+        .alias(COL_NAME_TOTAL_COUNT_FLIGHT_WITH_DELAY_GTE_15MIN),
+        pl.when(is_delay_41_46_gt_15min.any())
+        .then(pl.col(COL_NAME_FLIGHT_COUNT).filter(is_delay_41_46_gt_15min).sum())
+        .alias(COL_NAME_TOTAL_COUNT_FLIGHT_WITH_DELAY_41_46_GTE_15MIN),
+    ]
+
+
+def get_reliability_columns() -> list[pl.Expr]:
+    """Percentages of the flights outside each delayed count."""
+    return [
+        ## delay
+        pl.lit(1)
+        .sub(
+            pl.col(COL_NAME_TOTAL_COUNT_FLIGHT_WITH_DELAY)
+            / (pl.col(COL_NAME_TOTAL_COUNT))
+        )
+        .mul(100)
+        .round(2)
+        .alias(COL_NAME_PER_FLIGHTS_NOT_DELAYED),
+        ## delay > 15
+        pl.lit(1)
+        .sub(
+            pl.col(COL_NAME_TOTAL_COUNT_FLIGHT_WITH_DELAY_GTE_15MIN)
+            / (pl.col(COL_NAME_TOTAL_COUNT))
+        )
+        .mul(100)
+        .round(2)
+        .alias(COL_NAME_PER_DELAYED_FLIGHTS_NOT_WITH_15MIN),
+        ## delay > 15 min for 41 42
+        pl.lit(1)
+        .sub(
+            (
+                pl.col(COL_NAME_TOTAL_COUNT_FLIGHT_WITH_DELAY_41_46_GTE_15MIN)
+                / pl.col(COL_NAME_TOTAL_COUNT)
+            )
+        )
+        .mul(100)
+        .round(2)
+        .alias(COL_NAME_PER_DELAYED_FLIGHTS_15MIN_NOT_WITH_41_46),
+    ]
 
-    delayed_flights_count_df = df.group_by(COL_NAME_WINDOW_TIME).agg(
-        pl.len().alias(COL_NAME_TOTAL_COUNT_FLIGHT_WITH_DELAY)
-    )
 
-    delayed_15min_df = df.filter((pl.col("DELAY_TIME") > 15))
+def calculate_graph_info_with_period(
+    df: pl.LazyFrame, filters: Optional[FilterType] = None
+) -> pl.LazyFrame:
 
-    ##
-    delayed_15min_count_df = delayed_15min_df.group_by(COL_NAME_WINDOW_TIME).agg(
-        pl.len().alias(COL_NAME_TOTAL_COUNT_FLIGHT_WITH_DELAY_GTE_15MIN)
-    )
+    assert df is not None
 
-    ##
-    delayed_flights_41_46_gte_15min_count_df = (
-        delayed_15min_df.filter(pl.col("DELAY_CODE").is_in({41, 46}))
-        .group_by(COL_NAME_WINDOW_TIME)
-        .agg(pl.len().alias(COL_NAME_TOTAL_COUNT_FLIGHT_WITH_DELAY_41_46_GTE_15MIN))
+    # one pass over the cube, a window without matching flights stays null
+    delayed_flights_count_df = df.group_by(COL_NAME_WINDOW_TIME).agg(
+        get_delay_count_aggs()
     )
 
-    total_df = get_total_df()
+    total_df = get_total_df(filters)
 
-    joined_df = (
-        total_df.join(delayed_flights_count_df, COL_NAME_WINDOW_TIME, how="left")
-        .join(delayed_15min_count_df, COL_NAME_WINDOW_TIME, how="left")
-        .join(
-            delayed_flights_41_46_gte_15min_count_df,
-            COL_NAME_WINDOW_TIME,
-            how="left",
-        )
+    joined_df = total_df.join(
+        delayed_flights_count_df, COL_NAME_WINDOW_TIME, how="left"
     )
 
     joined_df = joined_df.sort(COL_NAME_WINDOW_TIME)
 
-    joined_df = joined_df.with_columns(
-        [
-            ## delay
-            pl.lit(1)
-            .sub(
-                pl.col(COL_NAME_TOTAL_COUNT_FLIGHT_WITH_DELAY)
-                / (pl.col(COL_NAME_TOTAL_COUNT))
-            )
-            .mul(100)
-            .round(2)
-            .alias(COL_NAME_PER_FLIGHTS_NOT_DELAYED),
-            ## delay > 15
-            pl.lit(1)
-            .sub(
-                pl.col(COL_NAME_TOTAL_COUNT_FLIGHT_WITH_DELAY_GTE_15MIN)
-                / (pl.col(COL_NAME_TOTAL_COUNT))
-            )
-            .mul(100)
-            .round(2)
-            .alias(COL_NAME_PER_DELAYED_FLIGHTS_NOT_WITH_15MIN),
-            ## delay > 15 min for 41 42
-            pl.lit(1)
-            .sub(
-                (
-                    pl.col(COL_NAME_TOTAL_COUNT_FLIGHT_WITH_DELAY_41_46_GTE_15MIN)
-                    / pl.col(COL_NAME_TOTAL_COUNT)
-                )
-            )
-            .mul(100)
-            .round(2)
-            .alias(COL_NAME_PER_DELAYED_FLIGHTS_15MIN_NOT_WITH_41_46),
-        ]
-    )
+    joined_df = joined_df.with_columns(get_reliability_columns())
 
     return joined_df
 
 
 @cache_result("preformance_metrics")
-def calculate_result() -> Optional[pl.DataFrame]:
+def calculate_result(filters: Optional[FilterType] = None) -> Optional[pl.DataFrame]:
 
-    df = get_df()
+    df = get_cube_df(filters)
 
     if df is None:
         return None
 
-    df = calculate_graph_info_with_period(df)
+    df = calculate_graph_info_with_period(df, filters)
 
     return df.collect()
@@ -0,0 +1,248 @@
+from datetime import date, timedelta
+import logging
+import threading
+from typing import Optional
+
+import polars as pl
+
+from calculations.performance_metrics import (
+    COL_NAME_TOTAL_COUNT_FLIGHT_WITH_DELAY,
+    COL_NAME_TOTAL_COUNT_FLIGHT_WITH_DELAY_41_46_GTE_15MIN,
+    COL_NAME_TOTAL_COUNT_FLIGHT_WITH_DELAY_GTE_15MIN,
+    get_delay_count_aggs,
+    get_reliability_columns,
+)
+from data_managers.cache_manager import cache_result
+from data_managers.excel_manager import (
+    COL_NAME_DEPARTURE_DATETIME,
+    COL_NAME_TOTAL_COUNT,
+    get_cube_df_unfiltered,
+    get_dataset_version,
+    get_date_index,
+    get_df_raw,
+    get_load_generation,
+)
+from schemas.filter import FilterType
+from utils_dashboard.utils_fingerprint import normalize_filter_date
+
+# moving windows in days, each day closes its own windows
+RELIABILITY_WINDOWS = [7, 30, 90]
+
+COL_NAME_WINDOW_DAYS = "window_days"
+
+SUBTYPE_KEYS = ["AC_SUBTYPE"]
+REGISTRATION_KEYS = ["AC_SUBTYPE", "AC_REGISTRATION"]
+
+COUNT_COLUMNS = [
+    COL_NAME_TOTAL_COUNT,
+    COL_NAME_TOTAL_COUNT_FLIGHT_WITH_DELAY,
+    COL_NAME_TOTAL_COUNT_FLIGHT_WITH_DELAY_GTE_15MIN,
+    COL_NAME_TOTAL_COUNT_FLIGHT_WITH_DELAY_41_46_GTE_15MIN,
+]
+
+
+def get_daily_counts(
+    raw_df: pl.DataFrame, cube_df: pl.DataFrame, keys: list[str]
+) -> pl.DataFrame:
+    """Flights and delayed flights per day and keys, sorted by day."""
+    group_columns = [COL_NAME_DEPARTURE_DATETIME, *keys]
+
+    totals = (
+        raw_df.lazy()
+        .drop_nulls(COL_NAME_DEPARTURE_DATETIME)
+        .group_by(group_columns)
+        .agg(pl.len().alias(COL_NAME_TOTAL_COUNT))
+    )
+    delayed = cube_df.lazy().group_by(group_columns).agg(get_delay_count_aggs())
+
+    return (
+        totals.join(delayed, on=group_columns, how="left", nulls_equal=True)
+        # a day without delays counts 0, the windows then sum over it
+        .with_columns(pl.col(COUNT_COLUMNS[1:]).fill_null(0))
+        .sort(group_columns)
+        .collect()
+    )
+
+
+def get_rolling_reliability(
+    daily_df: pl.DataFrame, keys: list[str], since: Optional[date] = None
+) -> pl.DataFrame:
+    """Reliability of every window ending on the days from since on."""
+    if since is not None:
+        # only the days the windows ending from since on reach back to
+        daily_df = daily_df.filter(
+            pl.col(COL_NAME_DEPARTURE_DATETIME)
+            > since - timedelta(days=max(RELIABILITY_WINDOWS))
+        )
+    # rolling wants each group sorted on its index
+    daily_df = daily_df.sort([*keys, COL_NAME_DEPARTURE_DATETIME])
+
+    rolled = pl.concat(
+        [
+            daily_df.rolling(
+                index_column=COL_NAME_DEPARTURE_DATETIME,
+                period=f"{days}d",
+                group_by=keys,
+            )
+            .agg(pl.col(COUNT_COLUMNS).sum())
+            .with_columns(pl.lit(days, pl.UInt16).alias(COL_NAME_WINDOW_DAYS))
+            for days in RELIABILITY_WINDOWS
+        ]
+    )
+    if since is not None:
+        rolled = rolled.filter(pl.col(COL_NAME_DEPARTURE_DATETIME) >= since)
+
+    return rolled.with_columns(get_reliability_columns()).sort(
+        COL_NAME_DEPARTURE_DATETIME
+    )
+
+
+def count_rows_before(df: pl.DataFrame, day: date) -> int:
+    lower, upper = get_date_index(df).get_bounds(None, day - timedelta(days=1))
+    return upper - lower
+
+
+class ReliabilitySeries:
+    """Daily counts and moving reliability of one level of keys.
+
+    Built once per loaded dataset. When rows of later days are appended the
+    last day is recounted, the new days are added and only the windows
+    ending on them are rolled, the older part of the series is kept.
+    """
+
+    def __init__(self, keys: list[str]):
+        self.keys = keys
+
+        self._lock = threading.Lock()
+        self.dataset_version: Optional[str] = None
+        self.generation: Optional[int] = None
+        self.last_day: Optional[date] = None
+        # rows of the base frames before last_day, an append leaves them alone
+        self.settled_rows: tuple[int, int] = (0, 0)
+        self.daily_df: Optional[pl.DataFrame] = None
+        self.rolling_df: Optional[pl.DataFrame] = None
+
+    def get(self) -> Optional[pl.DataFrame]:
+        raw_df, cube_df = get_df_raw(), get_cube_df_unfiltered()
+        if raw_df is None or cube_df is None:
+            return None
+
+        with self._lock:
+            dataset_version = get_dataset_version()
+            if self.rolling_df is not None and self.dataset_version == dataset_version:
+                return self.rolling_df
+
+            if self.can_extend(raw_df, cube_df):
+                self.extend(raw_df, cube_df)
+            else:
+                self.rebuild(raw_df, cube_df)
+            self.dataset_version = dataset_version
+            return self.rolling_df
+
+    def can_extend(self, raw_df: pl.DataFrame, cube_df: pl.DataFrame) -> bool:
+        if self.rolling_df is None or self.last_day is None:
+            return False
+        if self.generation != get_load_generation():
+            return False
+        settled_rows = (
+            count_rows_before(raw_df, self.last_day),
+            count_rows_before(cube_df, self.last_day),
+        )
+        return settled_rows == self.settled_rows
+
+    def rebuild(self, raw_df: pl.DataFrame, cube_df: pl.DataFrame) -> None:
+        logging.info(f"Building the reliability series of {self.keys}")
+        self.daily_df = get_daily_counts(raw_df, cube_df, self.keys)
+        self.rolling_df = get_rolling_reliability(self.daily_df, self.keys)
+        self.generation = get_load_generation()
+        self.mark_settled(raw_df, cube_df)
+
+    def extend(self, raw_df: pl.DataFrame, cube_df: pl.DataFrame) -> None:
+        since = self.last_day
+        logging.info(f"Extending the reliability series of {self.keys} from {since}")
+
+        # the last known day may have been appended to, it is counted again
+        appended_daily_df = get_daily_counts(
+            get_date_index(raw_df).slice(since, None),
+            get_date_index(cube_df).slice(since, None),
+            self.keys,
+        )
+        self.daily_df = pl.concat(
+            [
+                self.daily_df.filter(pl.col(COL_NAME_DEPARTURE_DATETIME) < since),
+                appended_daily_df,
+            ]
+        )
+        self.rolling_df = pl.concat(
+            [
+                self.rolling_df.filter(pl.col(COL_NAME_DEPARTURE_DATETIME) < since),
+                get_rolling_reliability(self.daily_df, self.keys, since),
+            ]
+        )
+        self.mark_settled(raw_df, cube_df)
+
+    def mark_settled(self, raw_df: pl.DataFrame, cube_df: pl.DataFrame) -> None:
+        self.last_day = (
+            self.daily_df[COL_NAME_DEPARTURE_DATETIME].max()
+            if not self.daily_df.is_empty()
+            else None
+        )
+        if self.last_day is not None:
+            self.settled_rows = (
+                count_rows_before(raw_df, self.last_day),
+                count_rows_before(cube_df, self.last_day),
+            )
+
+
+subtype_series = ReliabilitySeries(SUBTYPE_KEYS)
+registration_series = ReliabilitySeries(REGISTRATION_KEYS)
+
+
+def filter_reliability(df: pl.DataFrame, filters: Optional[FilterType]) -> pl.DataFrame:
+    """Rows of the selected subtypes, registrations and days.
+
+    Windows starting before dt_start still count their earlier days, the
+    delay codes and segmentation of the filters do not apply to the series.
+    """
+    filters = filters or {}
+    day = pl.col(COL_NAME_DEPARTURE_DATETIME)
+
+    start = normalize_filter_date(filters.get("dt_start"))
+    if start:
+        df = df.filter(day >= date.fromisoformat(start))
+    end = normalize_filter_date(filters.get("dt_end"))
+    if end:
+        df = df.filter(day <= date.fromisoformat(end))
+
+    subtypes = filters.get("fl_subtypes")
+    if subtypes:
+        df = df.filter(pl.col("AC_SUBTYPE").cast(pl.Utf8).is_in(subtypes))
+    matricules = filters.get("fl_matricules")
+    if matricules and "AC_REGISTRATION" in df.columns:
+        df = df.filter(pl.col("AC_REGISTRATION").cast(pl.Utf8).is_in(matricules))
+
+    return df
+
+
+@cache_result("reliability_rolling_subtype")
+def calculate_subtype_reliability(
+    filters: Optional[FilterType] = None,
+) -> Optional[pl.DataFrame]:
+    df = subtype_series.get()
+    if df is None:
+        return None
+    return filter_reliability(df, filters).sort(
+        [*SUBTYPE_KEYS, COL_NAME_WINDOW_DAYS, COL_NAME_DEPARTURE_DATETIME]
+    )
+
+
+@cache_result("reliability_rolling_registration")
+def calculate_registration_reliability(
+    filters: Optional[FilterType] = None,
+) -> Optional[pl.DataFrame]:
+    df = registration_series.get()
+    if df is None:
+        return None
+    return filter_reliability(df, filters).sort(
+        [*REGISTRATION_KEYS, COL_NAME_WINDOW_DAYS, COL_NAME_DEPARTURE_DATETIME]
+    )
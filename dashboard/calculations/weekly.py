@@ -1,13 +1,15 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import List, Optional, Tuple
 import polars as pl
 
 # ─────────────── Application modules ───────────────
 from data_managers.cache_manager import cache_result
-from utils_dashboard.utils_filter import get_date_range
 from data_managers.excel_manager import (
-    get_df,
+    COL_NAME_FLIGHT_COUNT,
+    get_cube_df,
 )
+from schemas.filter import FilterType
+from utils_dashboard.utils_fingerprint import normalize_filter_date
 
 weekday_order = [
     "Monday",
@@ -19,6 +21,7 @@ weekday_order = [
     "Sunday",
 ]
 COL_NAME_DATE_PERCENTAGE = "{c}_pct"
+COL_NAME_WEEKDAY = "WEEKDAY_DEP"
 
 
 def get_weekday_range(start: datetime.date, end: datetime.date) -> List[str]:
@@ -32,35 +35,49 @@ def get_weekday_range(start: datetime.date, end: datetime.date) -> List[str]:
     return [weekday_order[(start_idx + i) % 7] for i in range(range_difference)]
 
 
+def get_filter_date(filters: Optional[FilterType], key: str) -> Optional[date]:
+    value = normalize_filter_date((filters or {}).get(key))
+    return date.fromisoformat(value) if value else None
+
+
 @cache_result("weekly_codes_analysis")
-def analyze_weekly_codes() -> Tuple[Optional[pl.DataFrame], List[str]]:
-    df_lazy = get_df()
+def analyze_weekly_codes(
+    filters: Optional[FilterType] = None,
+) -> Tuple[Optional[pl.DataFrame], List[str]]:
+    df_lazy = get_cube_df(filters)
     if df_lazy is None:
         return None, []
 
-    start_date, end_date = get_date_range()
-
-    df = df_lazy.with_columns(
-        pl.col("DEP_DAY_SCHED").dt.strftime("%A").alias("DAY_OF_WEEK_DEP")
-    ).collect()
+    # weekdays stay integers, 1 is Monday, the slots are named for display only
+    df = (
+        df_lazy.with_columns(
+            pl.col("DEP_DAY_SCHED").dt.weekday().alias(COL_NAME_WEEKDAY)
+        )
+        .group_by("DELAY_CODE")
+        .agg(
+            *[
+                pl.col(COL_NAME_FLIGHT_COUNT)
+                .filter(pl.col(COL_NAME_WEEKDAY) == weekday)
+                .sum()
+                .alias(day)
+                for weekday, day in enumerate(weekday_order, start=1)
+            ],
+            pl.col("DEP_DAY_SCHED").min().alias("first_day"),
+            pl.col("DEP_DAY_SCHED").max().alias("last_day"),
+        )
+        .collect()
+    )
 
     if df.is_empty():
         return None, []
 
-    # Group and pivot
-    pivot: pl.DataFrame = (
-        df.group_by(["DELAY_CODE", "DAY_OF_WEEK_DEP"])
-        .agg(pl.len().alias("n"), pl.col("DEP_DAY_SCHED").min())
-        .sort("DEP_DAY_SCHED")
-        .pivot(values="n", index="DELAY_CODE", columns="DAY_OF_WEEK_DEP")
-        .fill_null(0)
-    )
+    # the filter's own dates, the days of the data when it leaves one open
+    start_date = get_filter_date(filters, "dt_start") or df["first_day"].min()
+    end_date = get_filter_date(filters, "dt_end") or df["last_day"].max()
+    pivot = df.drop("first_day", "last_day")
 
     # ---- Reorder days according to the actual date range ----
     day_range = get_weekday_range(start_date, end_date)
-    for day in day_range:
-        if day not in pivot.columns:
-            pivot = pivot.with_columns(pl.lit(0).alias(day))
 
     # Only keep the day_range (in order) + DELAY_CODE
     pivot = pivot.select(["DELAY_CODE", *day_range])
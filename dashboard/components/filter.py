@@ -2,12 +2,14 @@ from typing import Optional
 import polars as pl
 from dash import Input, Output, State
 from utils_dashboard.utils_filter import set_name_from_filter
+from data_managers.cache_warmer import record_filter_usage
 from data_managers.excel_manager import (
     ID_DATA_STORE_TRIGGER,
     apply_filters,
-    update_df,
     get_df_unfiltered,
+    get_filtered_result,
     add_watch_file,
+    get_dataset_stats,
     get_min_max_date_raw_df,
 )
 from server_instance import get_app
@@ -17,6 +19,15 @@ from schemas.filter import FilterKey, FilterType
 from dash import html, dcc
 import logging
 
+# filters that remove rows, segmentation only changes the windows
+ROW_FILTER_KEYS: list[FilterKey] = [
+    "fl_subtypes",
+    "fl_matricules",
+    "fl_code_delays",
+    "dt_start",
+    "dt_end",
+]
+
 
 FILTER_SUBTYPE = "filter-subtype"
 FILTER_MATRICULE = "filter-matricule"
@@ -163,7 +174,7 @@ layout = dbc.Card(
 
 
 def split_views_by_exclusion(
-    df: pl.LazyFrame, filters: dict, *excludes: FilterKey
+    df: pl.LazyFrame | pl.DataFrame, filters: dict, *excludes: FilterKey
 ) -> pl.LazyFrame:
 
     # exclude matricule
@@ -174,6 +185,22 @@ def split_views_by_exclusion(
     return view_matricule
 
 
+def get_options_from_catalog(
+    filters: Optional[FilterType], exclude: FilterKey, column: str
+) -> Optional[list]:
+    # the catalog only knows the whole dataset, other active filters need a query
+    filters = filters or {}
+    if any(filters.get(key) for key in ROW_FILTER_KEYS if key != exclude):
+        return None
+
+    dataset_stats = get_dataset_stats()
+    if dataset_stats is None:
+        return None
+
+    column_stats = dataset_stats.unfiltered.columns.get(column)
+    return column_stats.distinct_values if column_stats else None
+
+
 def check_segmentation(filter1: FilterType, filter2: FilterType) -> bool:
 
     unit1 = filter1.get("fl_unit_segmentation")
@@ -236,33 +263,43 @@ def add_callbacks():
     )
     def update_filter_options(store_data, _):
 
-        base_lazy = get_df_unfiltered()  # your global LazyFrame
+        base_lazy = get_df_unfiltered()  # your global DataFrame
 
         if base_lazy is None:
             logging.warning("Base LazyFrame is None, returning empty options.")
             return [], [], [], None, None
-        v_sub = split_views_by_exclusion(base_lazy, store_data, "fl_subtypes")
-        v_mat = split_views_by_exclusion(base_lazy, store_data, "fl_matricules")
-        v_delay = split_views_by_exclusion(base_lazy, store_data, "fl_code_delays")
 
         # v_date = split_views_by_exclusion(base_lazy, store_data, "dt_start", "dt_end")
 
-        df_delay = v_delay.collect()
-        delay_codes = sorted(
-            df_delay.get_column("DELAY_CODE").drop_nulls().unique().to_list()
+        delay_codes = get_options_from_catalog(
+            store_data, "fl_code_delays", "DELAY_CODE"
         )
+        if delay_codes is None:
+            v_delay = split_views_by_exclusion(base_lazy, store_data, "fl_code_delays")
+            df_delay = v_delay.collect()
+            delay_codes = sorted(
+                df_delay.get_column("DELAY_CODE").drop_nulls().unique().to_list()
+            )
 
         # subtype dropdown
-        df_sub = v_sub.collect()
-        subtypes = sorted(
-            df_sub.get_column("AC_SUBTYPE").drop_nulls().unique().to_list()
-        )
+        subtypes = get_options_from_catalog(store_data, "fl_subtypes", "AC_SUBTYPE")
+        if subtypes is None:
+            v_sub = split_views_by_exclusion(base_lazy, store_data, "fl_subtypes")
+            df_sub = v_sub.collect()
+            subtypes = sorted(
+                df_sub.get_column("AC_SUBTYPE").drop_nulls().unique().to_list()
+            )
 
         # matricule dropdown
-        df_mat = v_mat.collect()
-        matricules = sorted(
-            df_mat.get_column("AC_REGISTRATION").drop_nulls().unique().to_list()
+        matricules = get_options_from_catalog(
+            store_data, "fl_matricules", "AC_REGISTRATION"
         )
+        if matricules is None:
+            v_mat = split_views_by_exclusion(base_lazy, store_data, "fl_matricules")
+            df_mat = v_mat.collect()
+            matricules = sorted(
+                df_mat.get_column("AC_REGISTRATION").drop_nulls().unique().to_list()
+            )
         logging.debug("Matricules extracted: %d items", len(matricules))
 
         # date bounds
@@ -365,22 +402,17 @@ def add_callbacks():
             "filter_data triggered with filter_store_data: %s", filter_store_data
         )
 
-        df = get_df_unfiltered()
-        if df is None:
-            logging.warning("Unfiltered DataFrame is None. Returning empty payload.")
-
-            return {"payload": [], "count": 0}
-        logging.debug("Applying filters to DataFrame.")
-        df, total_df = apply_filters(df, filter_store_data)
-
         logging.debug("Setting name from filter for display/logging.")
-        set_name_from_filter(filter_store_data)
+        set_name_from_filter(filter_store_data or {})
+        record_filter_usage(filter_store_data)
 
-        logging.debug("Updating global DataFrame after filtering.")
-        update_df(df, total_df)
+        # the pages read their frames from the registry with these filters
+        logging.debug("Materializing filtered frames in the registry.")
+        if get_filtered_result(filter_store_data) is None:
+            logging.warning("Unfiltered DataFrame is None, nothing to filter.")
 
-        logging.info("Data filtered successfully. Returning payload.")
-        return None
+        logging.info("Data filtered successfully. Returning filters.")
+        return filter_store_data or {}
 
     @app.callback(
         Output(FILTER_STORE_ACTUAL, "data"),
@@ -0,0 +1,321 @@
+from contextlib import contextmanager
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Iterator, Optional, Tuple
+
+import redis
+
+# value and remaining time to live in ms, -1 without expiry, like PTTL
+CachedEntry = Tuple[Optional[bytes], int]
+
+# expired entries of the local backends are removed every that many writes
+PURGE_EVERY_WRITES = 100
+
+# bumps once per dataset version, however many workers notice the change
+BUMP_EPOCH_SCRIPT = """
+if redis.call('GET', KEYS[2]) == ARGV[1] then
+    return tonumber(redis.call('GET', KEYS[1]) or '0')
+end
+redis.call('SET', KEYS[2], ARGV[1])
+return redis.call('INCR', KEYS[1])
+"""
+
+# deletes the lock only if this worker still holds it
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class CacheBackend:
+    """Store shared by the workers behind their in-process cache."""
+
+    name = "base"
+
+    def is_available(self) -> bool:
+        return True
+
+    def get_many(self, keys: list[str]) -> list[CachedEntry]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, expire_seconds: Optional[int]) -> bool:
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def get_int(self, key: str) -> int:
+        raise NotImplementedError
+
+    def bump_epoch(self, epoch_key: str, version_key: str, version: str) -> int:
+        """Increments epoch_key unless version_key already holds version."""
+        raise NotImplementedError
+
+    def acquire_lock(self, key: str, token: str, ttl_seconds: int) -> bool:
+        raise NotImplementedError
+
+    def release_lock(self, key: str, token: str) -> None:
+        raise NotImplementedError
+
+    def scan_keys(self, prefix: str, batch_size: int) -> Iterator[str]:
+        raise NotImplementedError
+
+    def delete_many(self, keys: list[str]) -> int:
+        raise NotImplementedError
+
+
+class RedisBackend(CacheBackend):
+    name = "redis"
+
+    def __init__(self, get_server: Callable[[], Optional[redis.Redis]]):
+        # the connection comes and goes with the reconnect thread
+        self.get_server = get_server
+
+    def is_available(self) -> bool:
+        return self.get_server() is not None
+
+    def get_many(self, keys: list[str]) -> list[CachedEntry]:
+        with self.get_server().pipeline() as pipe:
+            pipe.mget(keys)
+            for key in keys:
+                pipe.pttl(key)
+            values, *ttls_ms = pipe.execute()
+        return list(zip(values, ttls_ms))
+
+    def set(self, key: str, value: bytes, expire_seconds: Optional[int]) -> bool:
+        return bool(self.get_server().set(key, value, ex=expire_seconds))
+
+    def exists(self, key: str) -> bool:
+        return bool(self.get_server().exists(key))
+
+    def get_int(self, key: str) -> int:
+        return int(self.get_server().get(key) or 0)
+
+    def bump_epoch(self, epoch_key: str, version_key: str, version: str) -> int:
+        bump = self.get_server().register_script(BUMP_EPOCH_SCRIPT)
+        return int(bump(keys=[epoch_key, version_key], args=[version]))
+
+    def acquire_lock(self, key: str, token: str, ttl_seconds: int) -> bool:
+        return bool(self.get_server().set(key, token, nx=True, ex=ttl_seconds))
+
+    def release_lock(self, key: str, token: str) -> None:
+        release = self.get_server().register_script(RELEASE_LOCK_SCRIPT)
+        release(keys=[key], args=[token])
+
+    def scan_keys(self, prefix: str, batch_size: int) -> Iterator[str]:
+        # SCAN walks the keyspace in steps instead of blocking like KEYS
+        for key in self.get_server().scan_iter(match=f"{prefix}*", count=batch_size):
+            yield key.decode()
+
+    def delete_many(self, keys: list[str]) -> int:
+        # UNLINK frees the values off the Redis main thread
+        with self.get_server().pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.unlink(key)
+            return sum(pipe.execute())
+
+
+class LocalStoreBackend(CacheBackend):
+    """Backends living on this machine, composite operations run in transaction()."""
+
+    def transaction(self):
+        raise NotImplementedError
+
+    def read(self, key: str) -> Optional[Tuple[bytes, Optional[float]]]:
+        raise NotImplementedError
+
+    def write(self, key: str, value: bytes, expires_at: Optional[float]) -> None:
+        raise NotImplementedError
+
+    def read_alive(self, key: str) -> Optional[Tuple[bytes, Optional[float]]]:
+        entry = self.read(key)
+        if entry is None or (entry[1] is not None and entry[1] <= time.time()):
+            return None
+        return entry
+
+    def get_many(self, keys: list[str]) -> list[CachedEntry]:
+        now = time.time()
+        entries = []
+        with self.transaction():
+            for key in keys:
+                entry = self.read_alive(key)
+                if entry is None:
+                    entries.append((None, -2))
+                else:
+                    value, expires_at = entry
+                    ttl_ms = (
+                        -1 if expires_at is None else int((expires_at - now) * 1000)
+                    )
+                    entries.append((value, ttl_ms))
+        return entries
+
+    def set(self, key: str, value: bytes, expire_seconds: Optional[int]) -> bool:
+        expires_at = time.time() + expire_seconds if expire_seconds else None
+        with self.transaction():
+            self.write(key, value, expires_at)
+        return True
+
+    def exists(self, key: str) -> bool:
+        with self.transaction():
+            return self.read_alive(key) is not None
+
+    def get_int(self, key: str) -> int:
+        with self.transaction():
+            entry = self.read_alive(key)
+        return int(entry[0]) if entry is not None else 0
+
+    def bump_epoch(self, epoch_key: str, version_key: str, version: str) -> int:
+        with self.transaction():
+            epoch_entry = self.read_alive(epoch_key)
+            epoch = int(epoch_entry[0]) if epoch_entry is not None else 0
+            version_entry = self.read_alive(version_key)
+            if version_entry is not None and version_entry[0] == version.encode():
+                return epoch
+            self.write(version_key, version.encode(), None)
+            self.write(epoch_key, str(epoch + 1).encode(), None)
+            return epoch + 1
+
+    def acquire_lock(self, key: str, token: str, ttl_seconds: int) -> bool:
+        with self.transaction():
+            if self.read_alive(key) is not None:
+                return False
+            self.write(key, token.encode(), time.time() + ttl_seconds)
+            return True
+
+    def release_lock(self, key: str, token: str) -> None:
+        with self.transaction():
+            entry = self.read_alive(key)
+            if entry is not None and entry[0] == token.encode():
+                self.delete_many([key])
+
+
+class MemoryBackend(LocalStoreBackend):
+    """Plain dict, shared by the threads of this process only."""
+
+    name = "memory"
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entries: dict[str, Tuple[bytes, Optional[float]]] = {}
+        self._writes = 0
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            yield
+
+    def read(self, key: str) -> Optional[Tuple[bytes, Optional[float]]]:
+        return self._entries.get(key)
+
+    def write(self, key: str, value: bytes, expires_at: Optional[float]) -> None:
+        self._entries[key] = (value, expires_at)
+        self._writes += 1
+        if self._writes % PURGE_EVERY_WRITES == 0:
+            now = time.time()
+            for expired_key in [
+                key
+                for key, (_, expires_at) in self._entries.items()
+                if expires_at is not None and expires_at <= now
+            ]:
+                del self._entries[expired_key]
+
+    def scan_keys(self, prefix: str, batch_size: int) -> Iterator[str]:
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+        yield from keys
+
+    def delete_many(self, keys: list[str]) -> int:
+        with self._lock:
+            return sum(self._entries.pop(key, None) is not None for key in keys)
+
+
+class DiskBackend(LocalStoreBackend):
+    """SQLite file, keeps the results across restarts of a desktop build."""
+
+    name = "disk"
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._writes = 0
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None, timeout=30
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)"
+        )
+        logging.info(f"Disk cache backend at {path}")
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            # nested calls join the outer transaction
+            self._depth += 1
+            if self._depth == 1:
+                self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                if self._depth == 1:
+                    self._connection.execute("ROLLBACK")
+                raise
+            else:
+                if self._depth == 1:
+                    self._connection.execute("COMMIT")
+            finally:
+                self._depth -= 1
+
+    def read(self, key: str) -> Optional[Tuple[bytes, Optional[float]]]:
+        return self._connection.execute(
+            "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+
+    def write(self, key: str, value: bytes, expires_at: Optional[float]) -> None:
+        self._connection.execute(
+            "INSERT OR REPLACE INTO entries (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, expires_at),
+        )
+        self._writes += 1
+        if self._writes % PURGE_EVERY_WRITES == 0:
+            self._connection.execute(
+                "DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (time.time(),),
+            )
+
+    def scan_keys(self, prefix: str, batch_size: int) -> Iterator[str]:
+        last_key = ""
+        while True:
+            with self._lock:
+                rows = self._connection.execute(
+                    "SELECT key FROM entries WHERE key > ? AND key LIKE ? ESCAPE '\\' "
+                    "ORDER BY key LIMIT ?",
+                    (last_key, escape_like(prefix) + "%", batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            for (key,) in rows:
+                yield key
+            last_key = rows[-1][0]
+
+    def delete_many(self, keys: list[str]) -> int:
+        with self.transaction():
+            return sum(
+                self._connection.execute(
+                    "DELETE FROM entries WHERE key = ?", (key,)
+                ).rowcount
+                for key in keys
+            )
+
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
@@ -0,0 +1,117 @@
+import io
+import logging
+import pickle
+import struct
+from typing import Any
+
+import polars as pl
+import pyarrow as pa
+
+from configurations.config import get_base_config
+
+# every encoded value starts with the magic, older pickled entries do not
+CODEC_MAGIC = b"PLC1"
+
+TAG_NONE = b"N"
+TAG_DATAFRAME = b"D"
+TAG_TUPLE = b"T"
+TAG_PICKLE = b"P"
+
+LENGTH_FORMAT = "<Q"
+LENGTH_SIZE = struct.calcsize(LENGTH_FORMAT)
+
+IPC_COMPRESSIONS = ("lz4", "zstd", "uncompressed")
+
+# init
+
+codec_compression = get_base_config().get("cache", {}).get("codec_compression", "lz4")
+
+if codec_compression not in IPC_COMPRESSIONS:
+    logging.warning(
+        f"Unknown cache codec compression '{codec_compression}', using lz4."
+    )
+    codec_compression = "lz4"
+
+# func
+
+
+def encode_item(value: Any, buffer: io.BytesIO) -> None:
+    if value is None:
+        buffer.write(TAG_NONE)
+
+    elif isinstance(value, pl.DataFrame):
+        buffer.write(TAG_DATAFRAME)
+        # length prefixed so the frame can sit inside a tuple
+        length_position = buffer.tell()
+        buffer.write(struct.pack(LENGTH_FORMAT, 0))
+        value.write_ipc_stream(buffer, compression=codec_compression)
+        end_position = buffer.tell()
+
+        buffer.seek(length_position)
+        buffer.write(
+            struct.pack(LENGTH_FORMAT, end_position - length_position - LENGTH_SIZE)
+        )
+        buffer.seek(end_position)
+
+    elif isinstance(value, pl.LazyFrame):
+        # a pickled plan would carry the whole frame it was built from
+        encode_item(value.collect(), buffer)
+
+    elif isinstance(value, tuple):
+        buffer.write(TAG_TUPLE)
+        buffer.write(struct.pack(LENGTH_FORMAT, len(value)))
+        for item in value:
+            encode_item(item, buffer)
+
+    else:
+        # lists and scalars are rare and small
+        payload = pickle.dumps(value)
+        buffer.write(TAG_PICKLE)
+        buffer.write(struct.pack(LENGTH_FORMAT, len(payload)))
+        buffer.write(payload)
+
+
+def decode_item(data: memoryview, position: int) -> tuple[Any, int]:
+    tag = bytes(data[position : position + 1])
+    position += 1
+
+    if tag == TAG_NONE:
+        return None, position
+
+    (length,) = struct.unpack_from(LENGTH_FORMAT, data, position)
+    position += LENGTH_SIZE
+
+    if tag == TAG_DATAFRAME:
+        # arrow reads the stream in place, the columns reference the payload
+        reader = pa.ipc.open_stream(pa.py_buffer(data[position : position + length]))
+        frame = pl.from_arrow(reader.read_all(), rechunk=False)
+        return frame, position + length
+
+    if tag == TAG_TUPLE:
+        items = []
+        for _ in range(length):
+            item, position = decode_item(data, position)
+            items.append(item)
+        return tuple(items), position
+
+    if tag == TAG_PICKLE:
+        return pickle.loads(data[position : position + length]), position + length
+
+    raise ValueError(f"Unknown cache codec tag {tag!r}")
+
+
+def encode_value(value: Any) -> bytes:
+    """Serialize a cached result, frames as Arrow IPC streams."""
+    buffer = io.BytesIO()
+    buffer.write(CODEC_MAGIC)
+    encode_item(value, buffer)
+    return buffer.getvalue()
+
+
+def decode_value(payload: bytes) -> Any:
+    if not payload.startswith(CODEC_MAGIC):
+        # written before the codec existed
+        return pickle.loads(payload)
+
+    value, _ = decode_item(memoryview(payload), len(CODEC_MAGIC))
+    return value
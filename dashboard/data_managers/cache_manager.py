@@ -1,11 +1,26 @@
-import pickle
+from concurrent.futures import Future
 import threading
 import time
-from typing import Any, Optional
+from typing import Any, Callable, Optional, Tuple
+import uuid
 import redis
 import logging
 import functools
-from utils_dashboard.utils_filter import get_filter_list
+import inspect
+import os
+from configurations.config import get_base_config, get_cache_dir_sys
+from data_managers.cache_backends import (
+    CacheBackend,
+    DiskBackend,
+    MemoryBackend,
+    RedisBackend,
+)
+from data_managers.cache_codec import decode_value, encode_value
+from data_managers.excel_manager import get_dataset_version, get_filtered_result
+from data_managers.local_cache import LocalCache, TierStats
+from schemas.filter import FilterType
+from utils_dashboard.utils_fingerprint import get_filter_fingerprint
+from utils_dashboard.utils_metrics import CounterMetric, HistogramMetric
 
 NAME_TABLE = "calculations"
 
@@ -13,35 +28,197 @@ redis_server: Optional[redis.Redis] = None
 redis_reconnect_thread: Optional[threading.Thread] = None
 _reconnect_lock = threading.Lock()
 
+l1_max_megabytes = get_base_config().get("cache", {}).get("l1_max_megabytes", 256)
+
+# L1 lives in this process and keeps serving while Redis (L2) is unreachable
+l1_cache = LocalCache(max_bytes=l1_max_megabytes * 1024 * 1024)
+l1_stats = TierStats()
+l2_stats = TierStats()
+
+cache_lookups_metric = CounterMetric(
+    "dashboard_cache_lookups_total",
+    "Cache lookups per tier and calculation prefix.",
+    ("tier", "prefix", "result"),
+)
+cache_lookup_seconds_metric = HistogramMetric(
+    "dashboard_cache_lookup_seconds",
+    "Time spent reading a cache tier.",
+    ("tier", "prefix"),
+)
+cache_stored_bytes_metric = CounterMetric(
+    "dashboard_cache_stored_bytes_total",
+    "Encoded bytes written to the shared cache backend.",
+    ("prefix",),
+)
+calculation_seconds_metric = HistogramMetric(
+    "dashboard_calculation_seconds",
+    "Time spent computing a calculation missed by the cache.",
+    ("prefix",),
+)
+redis_connects_metric = CounterMetric(
+    "dashboard_redis_connect_attempts_total",
+    "Attempts to connect to Redis.",
+    ("result",),
+)
+
+epoch_refresh_seconds = (
+    get_base_config().get("cache", {}).get("epoch_refresh_seconds", 1)
+)
+
+# namespace epoch, a data change bumps it instead of deleting keys
+local_epoch = 0
+local_epoch_version: Optional[str] = None
+local_epoch_checked_at = 0.0
+
+scan_batch_size = get_base_config().get("cache", {}).get("scan_batch_size", 500)
+purge_stale_namespaces = (
+    get_base_config().get("cache", {}).get("purge_stale_namespaces", True)
+)
+
+lock_ttl_seconds = get_base_config().get("cache", {}).get("lock_ttl_seconds", 30)
+lock_wait_seconds = get_base_config().get("cache", {}).get("lock_wait_seconds", 30)
+lock_poll_seconds = get_base_config().get("cache", {}).get("lock_poll_seconds", 0.05)
+
+# single flight, one computation per key in this worker
+_inflight: dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+# calculations keyed on filters, the cache warmer replays them per prefix
+warmable_functions: dict[str, Tuple[Callable, Callable[[FilterType], tuple]]] = {}
+
+invalidation_thread: Optional[threading.Thread] = None
+_invalidation_lock = threading.Lock()
+invalidation_progress: dict = {"running": False}
+
+cache_backend_name = get_base_config().get("cache", {}).get("backend", "redis")
+cache_disk_path = get_base_config().get("cache", {}).get("disk_path", "")
+
+cache_backend: Optional[CacheBackend] = None
+_backend_lock = threading.Lock()
+
 
 def get_redis_server() -> Optional[redis.Redis]:
     global redis_server, redis_reconnect_thread
+    if cache_backend_name != "redis":
+        # another backend is configured, redis is never connected
+        return None
     if redis_server is None and redis_reconnect_thread is None:
         start_redis_reconnect_thread()
     return redis_server
 
 
+def init_cache_backend() -> CacheBackend:
+    if cache_backend_name == "memory":
+        return MemoryBackend()
+    if cache_backend_name == "disk":
+        path = cache_disk_path or os.path.join(get_cache_dir_sys(), "cache.sqlite")
+        return DiskBackend(path)
+    if cache_backend_name != "redis":
+        logging.warning(f"Unknown cache backend '{cache_backend_name}', no L2 cache.")
+    return RedisBackend(get_redis_server)
+
+
+def get_cache_backend() -> Optional[CacheBackend]:
+    """The shared cache backend, None while it is unreachable."""
+    global cache_backend
+    with _backend_lock:
+        if cache_backend is None:
+            cache_backend = init_cache_backend()
+    return cache_backend if cache_backend.is_available() else None
+
+
 def join_key(*args: str) -> str:
     key = ":".join((NAME_TABLE, *args))
     logging.debug(f"join_key called with args={args}, returning key='{key}'")
     return key
 
 
+EPOCH_KEY = join_key("epoch")
+EPOCH_VERSION_KEY = join_key("epoch_version")
+
+
+def get_cache_epoch() -> int:
+    global local_epoch, local_epoch_checked_at
+
+    now = time.monotonic()
+    if now - local_epoch_checked_at < epoch_refresh_seconds:
+        return local_epoch
+
+    backend = get_cache_backend()
+    if backend is not None:
+        try:
+            local_epoch = backend.get_int(EPOCH_KEY)
+        except Exception as e:
+            logging.error(f"Failed to read cache epoch: {e}")
+    local_epoch_checked_at = now
+    return local_epoch
+
+
+def bump_cache_epoch(dataset_version: Optional[str]) -> int:
+    global local_epoch, local_epoch_version, local_epoch_checked_at
+
+    version = dataset_version or "none"
+    backend = get_cache_backend()
+    if backend is not None:
+        try:
+            epoch = backend.bump_epoch(EPOCH_KEY, EPOCH_VERSION_KEY, version)
+        except Exception as e:
+            logging.error(f"Failed to bump cache epoch: {e}")
+            epoch = local_epoch + (version != local_epoch_version)
+    else:
+        epoch = local_epoch + (version != local_epoch_version)
+
+    if epoch != local_epoch:
+        # entries of the old namespace are unreachable, free them now
+        deleted_local = l1_cache.delete_prefix(join_key(""))
+        logging.info(
+            f"Cache epoch {local_epoch} -> {epoch} for dataset {version}, "
+            f"dropped {deleted_local} local key(s)."
+        )
+        if purge_stale_namespaces:
+            start_delete_old_keys_thread(keep_prefix=join_key(version, f"e{epoch}", ""))
+
+    local_epoch, local_epoch_version = epoch, version
+    local_epoch_checked_at = time.monotonic()
+    return epoch
+
+
+def get_cache_namespace() -> tuple[str, str]:
+    # a process still holding the old file computes under the old version
+    return get_dataset_version() or "none", f"e{get_cache_epoch()}"
+
+
+def get_cache_key(fingerprint: str, redis_key_prefix: str) -> str:
+    return join_key(*get_cache_namespace(), fingerprint, redis_key_prefix)
+
+
+def get_key_prefix(key: str) -> str:
+    return key.rsplit(":", 1)[-1]
+
+
+def record_lookup(tier: str, key: str, hit: bool, seconds: float) -> None:
+    stats = l1_stats if tier == "l1" else l2_stats
+    stats.record(hit, seconds)
+    prefix = get_key_prefix(key)
+    cache_lookups_metric.inc(tier=tier, prefix=prefix, result="hit" if hit else "miss")
+    cache_lookup_seconds_metric.observe(seconds, tier=tier, prefix=prefix)
+
+
 def does_key_exist(key: str) -> Optional[bool]:
-    r = get_redis_server()
-    if r is None:
+    backend = get_cache_backend()
+    if backend is None:
         return None
-    exists = bool(r.exists(key))
+    exists = backend.exists(key)
     logging.debug(f"does_key_exist: key='{key}', exists={exists}")
     return exists
 
 
 def does_table_exist() -> Optional[bool]:
-    r = get_redis_server()
+    backend = get_cache_backend()
 
-    if r is None:
+    if backend is None:
         return None
-    exists = bool(r.exists(NAME_TABLE))
+    exists = backend.exists(NAME_TABLE)
     logging.debug(f"does_table_exist: table='{NAME_TABLE}', exists={exists}")
     return exists
 
@@ -65,44 +242,106 @@ def init_server() -> Optional[redis.Redis]:
         r.ping()
         logging.info("Redis connected")
         redis_server = r
+        redis_connects_metric.inc(result="success")
 
     except redis.exceptions.RedisError as e:
         logging.error("Redis connection failed during init: %s", e)
         redis_server = None
+        redis_connects_metric.inc(result="failure")
+
 
+def delete_old_keys(keep_prefix: Optional[str] = None) -> Optional[dict]:
+    global invalidation_progress
 
-def delete_old_keys() -> Optional[bool]:
-    r = get_redis_server()
+    if keep_prefix is None:
+        deleted_local = l1_cache.delete_prefix(join_key(""))
+        logging.info(f"Deleted {deleted_local} key(s) from the local cache.")
 
-    if r is None:
+    backend = get_cache_backend()
+
+    if backend is None:
         return None
 
     pattern = join_key("*")
-    keys = r.keys(pattern)
-    logging.info(f"Deleting keys with pattern '{pattern}': found {len(keys)} keys.")
+    protected = {EPOCH_KEY, EPOCH_VERSION_KEY}
+    # single-flight locks of computations in progress expire on their own
+    lock_prefix = join_key("lock", "")
+
+    progress = {
+        "running": True,
+        "pattern": pattern,
+        "keep_prefix": keep_prefix,
+        "scanned": 0,
+        "deleted": 0,
+        "batches": 0,
+        "started_at": time.time(),
+        "finished_at": None,
+        "error": None,
+    }
+    invalidation_progress = progress
+    logging.info(f"Deleting keys with pattern '{pattern}', keeping '{keep_prefix}'.")
+
+    # walks the keys in steps and deletes them in batches, never all at once
+    batch = []
+    try:
+        for key in backend.scan_keys(join_key(""), scan_batch_size):
+            progress["scanned"] += 1
+            if key in protected or key.startswith(lock_prefix):
+                continue
+            if keep_prefix and key.startswith(keep_prefix):
+                continue
+            batch.append(key)
+            if len(batch) >= scan_batch_size:
+                progress["deleted"] += backend.delete_many(batch)
+                progress["batches"] += 1
+                batch = []
+                logging.info(
+                    f"Invalidation progress: scanned={progress['scanned']}, "
+                    f"deleted={progress['deleted']}, batches={progress['batches']}"
+                )
+        if batch:
+            progress["deleted"] += backend.delete_many(batch)
+            progress["batches"] += 1
+    except Exception as e:
+        logging.error(f"Failed to delete keys with pattern '{pattern}': {e}")
+        progress["error"] = str(e)
+    finally:
+        progress["running"] = False
+        progress["finished_at"] = time.time()
+
+    logging.info(
+        f"Invalidation done: scanned={progress['scanned']}, "
+        f"deleted={progress['deleted']}, batches={progress['batches']}, "
+        f"in {progress['finished_at'] - progress['started_at']:.2f}s"
+    )
+    return progress
 
-    deleted_all = True
-    for key in keys:
-        try:
-            result = r.delete(key)
-            deleted_all = deleted_all and bool(result)
-            logging.debug(f"Deleted key: {key}, success: {bool(result)}")
-        except Exception as e:
-            logging.error(f"Failed to delete key {key}: {e}")
-            deleted_all = False
-    logging.info(f"All keys deleted successfully: {deleted_all}")
-    return deleted_all
+
+def start_delete_old_keys_thread(keep_prefix: Optional[str] = None) -> bool:
+    global invalidation_thread
+    with _invalidation_lock:
+        if invalidation_thread is not None and invalidation_thread.is_alive():
+            logging.info("Invalidation already running, skipping.")
+            return False
+        invalidation_thread = threading.Thread(
+            target=delete_old_keys, args=(keep_prefix,), daemon=True
+        )
+        invalidation_thread.start()
+        return True
 
 
 def set_calculation_to_cache(
     key: str, value: Any, expire_seconds: Optional[int] = None
 ) -> Optional[bool]:
-    r = get_redis_server()
-    if r is None:
+    l1_cache.set(key, value, expire_seconds)
+
+    backend = get_cache_backend()
+    if backend is None:
         return None
     try:
-        json_value = pickle.dumps(value)
-        result = r.set(key, json_value, ex=expire_seconds)
+        encoded_value = encode_value(value)
+        result = backend.set(key, encoded_value, expire_seconds)
+        cache_stored_bytes_metric.inc(len(encoded_value), prefix=get_key_prefix(key))
         logging.info(f"Set cache key='{key}' with value={value}, success={result}")
         return bool(result)
     except Exception as e:
@@ -110,46 +349,228 @@ def set_calculation_to_cache(
         return False
 
 
+def get_calculations_from_cache(keys: list[str]) -> list[Any]:
+    """Values of keys, None when missed, the shared ones in one round trip."""
+    results: list[Any] = [None] * len(keys)
+    missing = []
+    for index, key in enumerate(keys):
+        start = time.perf_counter()
+        results[index] = l1_cache.get(key)
+        record_lookup(
+            "l1", key, results[index] is not None, time.perf_counter() - start
+        )
+        if results[index] is not None:
+            logging.info(f"Local cache hit for key='{key}'.")
+        else:
+            missing.append(index)
+
+    backend = get_cache_backend()
+    if backend is None or not missing:
+        return results
+
+    missing_keys = [keys[index] for index in missing]
+    start = time.perf_counter()
+    try:
+        cached_entries = backend.get_many(missing_keys)
+    except Exception as e:
+        for key in missing_keys:
+            record_lookup("l2", key, False, time.perf_counter() - start)
+        logging.error(f"Failed to get cache for keys {missing_keys}: {e}")
+        return results
+
+    seconds = time.perf_counter() - start
+    for index, key, (cached_value, ttl_ms) in zip(
+        missing, missing_keys, cached_entries
+    ):
+        if cached_value is None:
+            record_lookup("l2", key, False, seconds)
+            logging.info(f"Cache miss for key='{key}'.")
+            continue
+        try:
+            results[index] = decode_value(cached_value)
+        except Exception as e:
+            record_lookup("l2", key, False, seconds)
+            logging.error(f"Failed to decode cache for key '{key}': {e}")
+            continue
+        record_lookup("l2", key, True, seconds)
+        logging.info(f"Cache hit for key='{key}'.")
+        # read through, the next lookup of this worker stays in process
+        l1_cache.set(
+            key, results[index], max(ttl_ms // 1000, 1) if ttl_ms > 0 else None
+        )
+    return results
+
+
 def get_calculation_from_cache(key) -> Any:
-    r = get_redis_server()
-    if r is None:
+    return get_calculations_from_cache([key])[0]
+
+
+def get_cache_stats() -> dict:
+    return {
+        "l1": {**l1_stats.snapshot(), **l1_cache.get_usage()},
+        "l2": {
+            **l2_stats.snapshot(),
+            "backend": cache_backend_name,
+            "connected": get_cache_backend() is not None,
+        },
+        "invalidation": dict(invalidation_progress),
+    }
+
+
+def acquire_compute_lock(key: str) -> Optional[str]:
+    """Token of the lock of key, None when another worker holds it."""
+    backend = get_cache_backend()
+    if backend is None:
+        return ""
+    token = uuid.uuid4().hex
+    try:
+        if backend.acquire_lock(join_key("lock", key), token, lock_ttl_seconds):
+            return token
         return None
+    except Exception as e:
+        logging.error(f"Failed to acquire lock for key '{key}': {e}")
+        return ""
+
+
+def release_compute_lock(key: str, token: str) -> None:
+    backend = get_cache_backend()
+    if backend is None or not token:
+        return
     try:
-        cached_value = r.get(key)
-        if cached_value is not None:
-            result = pickle.loads(cached_value)
-            logging.info(f"Cache hit for key='{key}'.")
-            return result
-        else:
-            logging.info(f"Cache miss for key='{key}'.")
+        backend.release_lock(join_key("lock", key), token)
+    except Exception as e:
+        logging.error(f"Failed to release lock for key '{key}': {e}")
+
+
+def wait_for_other_worker(key: str) -> Any:
+    deadline = time.monotonic() + lock_wait_seconds
+    backend = get_cache_backend()
+    while time.monotonic() < deadline:
+        time.sleep(lock_poll_seconds)
+        cached = get_calculation_from_cache(key)
+        if cached is not None:
+            return cached
+        try:
+            if backend is None or not backend.exists(join_key("lock", key)):
+                # the holder failed or expired without storing a result
+                return None
+        except Exception as e:
+            logging.error(f"Failed to check lock for key '{key}': {e}")
             return None
+    logging.warning(f"Timed out waiting for another worker on key '{key}'.")
+    return None
+
+
+def compute_once(key: str, compute: Callable[[], Any], expire_seconds: int) -> Any:
+    token = acquire_compute_lock(key)
+    if token is None:
+        logging.debug(f"Key {key} is computed by another worker, waiting.")
+        cached = wait_for_other_worker(key)
+        if cached is not None:
+            return cached
+        token = acquire_compute_lock(key) or ""
+
+    try:
+        # the previous holder may have stored it between the miss and the lock
+        cached = get_calculation_from_cache(key) if token else None
+        if cached is not None:
+            return cached
+        start = time.perf_counter()
+        result = compute()
+        calculation_seconds_metric.observe(
+            time.perf_counter() - start, prefix=get_key_prefix(key)
+        )
+        try:
+            set_calculation_to_cache(key, result, expire_seconds)
+        except Exception as e:
+            logging.warning(f"Failed to cache result for key {key}: {e}")
+        return result
+    finally:
+        release_compute_lock(key, token)
+
+
+def get_single_flight(key: str, compute: Callable[[], Any], expire_seconds: int) -> Any:
+    with _inflight_lock:
+        future = _inflight.get(key)
+        is_leader = future is None
+        if is_leader:
+            future = Future()
+            _inflight[key] = future
+
+    if not is_leader:
+        logging.debug(f"Key {key} is computed by this worker, waiting.")
+        return future.result()
+
+    try:
+        result = compute_once(key, compute, expire_seconds)
+        future.set_result(result)
+        return result
     except Exception as e:
-        logging.error(f"Failed to get cache for key '{key}': {e}")
-        return None
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+
+def no_warm_args(filters: FilterType) -> tuple:
+    return ()
 
 
-def cache_result(redis_key_prefix: str, expire_seconds: int = 3600):
+def cache_result(
+    redis_key_prefix: str,
+    expire_seconds: int = 3600,
+    warm_args: Callable[[FilterType], tuple] = no_warm_args,
+):
+    """warm_args builds the positional arguments the pages pass for given filters."""
+
     def decorator(func):
+        signature = inspect.signature(func)
+        if "filters" not in signature.parameters:
+            raise TypeError(f"{func.__qualname__} must take filters to be cached")
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            key = join_key(*get_filter_list(), redis_key_prefix)
+            # results are keyed on the caller's filters
+            arguments = signature.bind_partial(*args, **kwargs).arguments
+            fingerprint = get_filter_fingerprint(arguments.get("filters"))
+            key = get_cache_key(fingerprint, redis_key_prefix)
             cached = get_calculation_from_cache(key)
             if cached is not None:
                 logging.debug(f"Cache hit for key {key}")
                 return cached
             logging.debug(f"Cache miss for key {key}, running function.")
-            result = func(*args, **kwargs)
-            try:
-                set_calculation_to_cache(key, result, expire_seconds)
-            except Exception as e:
-                logging.warning(f"Failed to cache result for key {key}: {e}")
-            return result
+            return get_single_flight(key, lambda: func(*args, **kwargs), expire_seconds)
 
+        wrapper.redis_key_prefix = redis_key_prefix
+        wrapper.expire_seconds = expire_seconds
+        warmable_functions[redis_key_prefix] = (wrapper, warm_args)
         return wrapper
 
     return decorator
 
 
+def get_cached_results(funcs: list[Callable], filters: Optional[FilterType]) -> list:
+    """Results of calculations taking only filters, fetched and computed together."""
+    fingerprint = get_filter_fingerprint(filters)
+    keys = [get_cache_key(fingerprint, func.redis_key_prefix) for func in funcs]
+    results = get_calculations_from_cache(keys)
+
+    missing = [index for index, result in enumerate(results) if result is None]
+    if missing:
+        logging.debug(f"Cache miss for keys {[keys[index] for index in missing]}.")
+        # one shared collect, the calculations then read it from the registry
+        get_filtered_result(filters)
+        for index in missing:
+            func = funcs[index]
+            results[index] = get_single_flight(
+                keys[index],
+                lambda func=func: func.__wrapped__(filters=filters),
+                func.expire_seconds,
+            )
+    return results
+
+
 def background_redis_reconnector(interval_seconds=10):
     global redis_server
     while True:
@@ -170,5 +591,9 @@ def start_redis_reconnect_thread():
             redis_reconnect_thread.start()
 
 
-if redis_reconnect_thread is None and redis_server is None:
+if (
+    cache_backend_name == "redis"
+    and redis_reconnect_thread is None
+    and redis_server is None
+):
     start_redis_reconnect_thread()
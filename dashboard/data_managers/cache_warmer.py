@@ -0,0 +1,224 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+import importlib
+import json
+import logging
+import pkgutil
+import threading
+import time
+from typing import Optional
+import uuid
+
+from configurations.config import get_base_config
+from data_managers.cache_manager import (
+    get_cache_backend,
+    get_redis_server,
+    warmable_functions,
+)
+from data_managers.excel_manager import get_dataset_version
+from schemas.filter import FilterType
+from utils_dashboard.utils_fingerprint import (
+    canonicalize_filters,
+    get_filter_fingerprint,
+)
+
+NAME_TABLE = "filter_usage"
+
+base_config = get_base_config()
+
+warmer_enabled = base_config.get("warmer", {}).get("enabled", True)
+warmer_top_filters = base_config.get("warmer", {}).get("top_filters", 5)
+warmer_recent_days = base_config.get("warmer", {}).get("recent_days", 7)
+warmer_max_workers = base_config.get("warmer", {}).get("max_workers", 4)
+warmer_lock_seconds = base_config.get("warmer", {}).get("lock_seconds", 3600)
+
+# used when redis is down, counts per day of this worker only
+local_usage: dict[str, Counter] = {}
+local_filters: dict[str, FilterType] = {}
+_usage_lock = threading.Lock()
+
+warmer_thread: Optional[threading.Thread] = None
+pending_version: Optional[str] = None
+_warmer_lock = threading.Lock()
+warmer_progress: dict = {"running": False}
+
+
+def get_usage_day_key(day: date) -> str:
+    return f"{NAME_TABLE}:{day.isoformat()}"
+
+
+def record_filter_usage(filters: Optional[FilterType]) -> None:
+    canonical = canonicalize_filters(filters)
+    if not canonical:
+        # the default filter is always warmed
+        return
+
+    fingerprint = get_filter_fingerprint(canonical)
+    day_key = get_usage_day_key(date.today())
+
+    r = get_redis_server()
+    if r is not None:
+        try:
+            with r.pipeline(transaction=False) as pipe:
+                pipe.hset(f"{NAME_TABLE}:filters", fingerprint, json.dumps(canonical))
+                pipe.zincrby(day_key, 1, fingerprint)
+                pipe.expire(day_key, warmer_recent_days * 24 * 3600)
+                pipe.execute()
+            return
+        except Exception as e:
+            logging.error(f"Failed to record filter usage: {e}")
+
+    with _usage_lock:
+        local_filters[fingerprint] = canonical
+        local_usage.setdefault(day_key, Counter())[fingerprint] += 1
+
+
+def get_top_filters(n: int) -> list[FilterType]:
+    today = date.today()
+    day_keys = [
+        get_usage_day_key(today - timedelta(days=days))
+        for days in range(warmer_recent_days)
+    ]
+
+    counts: Counter = Counter()
+    r = get_redis_server()
+    if r is not None:
+        try:
+            with r.pipeline(transaction=False) as pipe:
+                for day_key in day_keys:
+                    pipe.zrange(day_key, 0, -1, withscores=True)
+                for day in pipe.execute():
+                    for fingerprint, score in day:
+                        counts[fingerprint.decode()] += score
+            top = [fingerprint for fingerprint, _ in counts.most_common(n)]
+            if not top:
+                return []
+            raw_filters = r.hmget(f"{NAME_TABLE}:filters", top)
+            return [json.loads(raw) for raw in raw_filters if raw is not None]
+        except Exception as e:
+            logging.error(f"Failed to read filter usage: {e}")
+
+    with _usage_lock:
+        for day_key in day_keys:
+            counts.update(local_usage.get(day_key, {}))
+        return [local_filters[fingerprint] for fingerprint, _ in counts.most_common(n)]
+
+
+def import_calculations() -> None:
+    # every @cache_result of calculations/ registers itself on import
+    import calculations
+
+    for module in pkgutil.iter_modules(calculations.__path__):
+        importlib.import_module(f"calculations.{module.name}")
+
+
+def acquire_warmer_lock(dataset_version: str) -> bool:
+    backend = get_cache_backend()
+    if backend is None:
+        return True
+    try:
+        # one worker warms the shared cache per dataset version
+        return backend.acquire_lock(
+            f"{NAME_TABLE}:warmer:{dataset_version}",
+            uuid.uuid4().hex,
+            warmer_lock_seconds,
+        )
+    except Exception as e:
+        logging.error(f"Failed to acquire warmer lock: {e}")
+        return True
+
+
+def warm_cache(dataset_version: Optional[str]) -> dict:
+    global warmer_progress
+
+    import_calculations()
+    filters_to_warm = [{}, *get_top_filters(warmer_top_filters)]
+    tasks = [
+        (prefix, filters)
+        for filters in filters_to_warm
+        for prefix in sorted(warmable_functions)
+    ]
+
+    progress = {
+        "running": True,
+        "dataset_version": dataset_version,
+        "filters": len(filters_to_warm),
+        "total": len(tasks),
+        "done": 0,
+        "failed": 0,
+        "cancelled": False,
+        "started_at": time.time(),
+        "finished_at": None,
+    }
+    warmer_progress = progress
+    logging.info(
+        f"Warming {len(warmable_functions)} calculation(s) for "
+        f"{len(filters_to_warm)} filter(s) of dataset {dataset_version}."
+    )
+
+    def warm(prefix: str, filters: FilterType) -> None:
+        if get_dataset_version() != dataset_version:
+            progress["cancelled"] = True
+            return
+        func, warm_args = warmable_functions[prefix]
+        func(*warm_args(filters), filters=filters)
+
+    try:
+        with ThreadPoolExecutor(max_workers=warmer_max_workers) as pool:
+            futures = {
+                pool.submit(warm, prefix, filters): prefix for prefix, filters in tasks
+            }
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                    progress["done"] += 1
+                except Exception as e:
+                    progress["failed"] += 1
+                    logging.error(f"Failed to warm '{futures[future]}': {e}")
+    finally:
+        progress["running"] = False
+        progress["finished_at"] = time.time()
+
+    logging.info(
+        f"Cache warmed: done={progress['done']}, failed={progress['failed']}, "
+        f"cancelled={progress['cancelled']}, "
+        f"in {progress['finished_at'] - progress['started_at']:.2f}s"
+    )
+    return progress
+
+
+def run_cache_warmer() -> None:
+    global warmer_thread, pending_version
+
+    while True:
+        with _warmer_lock:
+            dataset_version, pending_version = pending_version, None
+            if dataset_version is None:
+                warmer_thread = None
+                return
+        if dataset_version != get_dataset_version():
+            continue
+        if not acquire_warmer_lock(dataset_version):
+            logging.info(f"Dataset {dataset_version} is warmed by another worker.")
+            continue
+        warm_cache(dataset_version)
+
+
+def start_cache_warmer(dataset_version: Optional[str]) -> bool:
+    global warmer_thread, pending_version
+
+    if not warmer_enabled or dataset_version is None:
+        return False
+
+    with _warmer_lock:
+        # a running warmer picks the newest version up once its pass ends
+        pending_version = dataset_version
+        if warmer_thread is None:
+            warmer_thread = threading.Thread(target=run_cache_warmer, daemon=True)
+            warmer_thread.start()
+    return True
+
+
+def get_warmer_progress() -> dict:
+    return dict(warmer_progress)
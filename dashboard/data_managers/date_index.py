@@ -0,0 +1,60 @@
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import Optional, Tuple
+
+import polars as pl
+
+
+class DateIndex:
+    """Day -> row offset table of a frame sorted on a date column.
+
+    A date window is then two binary searches and a zero-copy slice
+    instead of a comparison over every row.
+    """
+
+    def __init__(self, df: pl.DataFrame, column: str):
+        self.df = df
+
+        dates = df.get_column(column)
+        # sorted frames keep their nulls first
+        self.null_count = dates.null_count()
+
+        runs = dates.slice(self.null_count).rle()
+        self.days: list[date] = runs.struct.field("value").to_list()
+
+        self.offsets: list[int] = [self.null_count]
+        for run_length in runs.struct.field("len").to_list():
+            self.offsets.append(self.offsets[-1] + run_length)
+
+    def get_bounds(
+        self, start: Optional[date], end: Optional[date]
+    ) -> Tuple[int, int]:
+        if start is None and end is None:
+            return 0, self.df.height
+
+        lower = 0 if start is None else bisect_left(self.days, start)
+        upper = len(self.days) if end is None else bisect_right(self.days, end)
+
+        return self.offsets[lower], self.offsets[max(lower, upper)]
+
+    def count_per_day(
+        self, start: Optional[date], end: Optional[date]
+    ) -> Tuple[list[Optional[date]], list[int]]:
+        """Rows per day of the window, read from the offsets without a scan."""
+        lower = 0 if start is None else bisect_left(self.days, start)
+        upper = len(self.days) if end is None else bisect_right(self.days, end)
+        upper = max(lower, upper)
+
+        days: list[Optional[date]] = self.days[lower:upper]
+        counts = [
+            self.offsets[position + 1] - self.offsets[position]
+            for position in range(lower, upper)
+        ]
+        # like get_bounds, the rows without a date only belong to the full window
+        if start is None and end is None and self.null_count:
+            days, counts = [None, *days], [self.null_count, *counts]
+        return days, counts
+
+    def slice(self, start: Optional[date], end: Optional[date]) -> pl.DataFrame:
+        lower, upper = self.get_bounds(start, end)
+        return self.df.slice(lower, upper - lower)
@@ -1,5 +1,7 @@
 from datetime import datetime, date
+import hashlib
 import os
+import time
 from typing import Optional, Tuple
 import dash
 import polars as pl
@@ -8,7 +10,20 @@ import logging
 from dash import Input, Output, dcc
 
 from configurations.config import get_base_config, get_user_config, save_config_sys
-from schemas.filter import FilterType
+from data_managers.date_index import DateIndex
+from data_managers.snapshot_manager import (
+    concat_snapshots,
+    describe_snapshot,
+    get_snapshot_key,
+    get_unchanged_rows,
+    read_excel_snapshot,
+    read_excel_snapshots,
+)
+from data_managers.result_registry import result_registry
+from data_managers.stats_manager import get_dataset_stats as build_dataset_stats
+from schemas.dataset_stats import DatasetStats
+from schemas.filter import FilteredResult, FilterType
+from schemas.snapshot import SnapshotSource
 from schemas.data_status import StatusData
 from server_instance import get_app
 from status.data_status_manager import (
@@ -16,13 +31,14 @@ from status.data_status_manager import (
     add_state_for_data_status,
     store_trigger_status,
 )
+from utils_dashboard.utils_fingerprint import get_filter_fingerprint
+from utils_dashboard.utils_metrics import HistogramMetric
 
 logging.info("Loading excel file...")
 
 # global
 
 ID_PATH_STORE = "is-path-store"
-ID_INTERVAL_WATCHER = "interval-file-selector"
 
 ID_STORE_DATE_WATCHER = "store-date-latest-fetch"
 
@@ -34,8 +50,32 @@ COL_NAME_WINDOW_TIME_MAX = "WINDOW_DATETIME_DEP_MAX"
 
 COL_NAME_TOTAL_COUNT = "total_count"
 
+COL_NAME_FLIGHT_COUNT = "flight_count"
+COL_NAME_DELAY_GT_15MIN = "DELAY_GT_15MIN"
+
+# one cube row per day and per combination of the columns the pages group by
+CUBE_KEY_COLUMNS = [
+    COL_NAME_DEPARTURE_DATETIME,
+    "DELAY_CODE",
+    "AC_SUBTYPE",
+    "AC_REGISTRATION",
+    "DEP_AP_SCHED",
+    "FAMILLE_DR",
+    COL_NAME_DELAY_GT_15MIN,
+]
+
 ID_DATA_STORE_TRIGGER = "filter-store-trigger"
 
+DATASET_MODE_SINGLE = "single"
+DATASET_MODE_DIRECTORY = "directory"
+
+# repeated strings, stored dictionary encoded when dataset.categorical is on
+CATEGORICAL_COLUMNS = ["AC_REGISTRATION", "AC_SUBTYPE", "DEP_AP_SCHED", "FAMILLE_DR"]
+
+# code -> family/label mapping, kept once per code instead of once per flight
+DELAY_CODE_DIM_COLUMNS = ["DELAY_CODE", "FAMILLE_DR", "LIB_CODE_DR"]
+DELAY_CODE_DIM_ONLY_COLUMNS = ["LIB_CODE_DR"]
+
 # init
 
 app = get_app()
@@ -44,6 +84,8 @@ base_config = get_base_config()
 config = get_user_config()
 
 dir_path = base_config.get("dir_path", "")
+dataset_mode = base_config.get("dataset", {}).get("mode", DATASET_MODE_SINGLE)
+dataset_categorical = base_config.get("dataset", {}).get("categorical", True)
 path_to_excel_cashed = config.get("path_to_excel", "")
 
 # func
@@ -84,6 +126,22 @@ def get_path_to_excel() -> str:
 
             logging.debug(f"Cashed path doesn't exist : {path_to_excel_cashed}")
 
+    list_name_excels = list_excels_in_dir()
+
+    if not list_name_excels:
+        return None
+
+    first_excel = list_name_excels[0]
+    full_path = os.path.join(dir_path, first_excel)
+
+    config = save_config_sys({"path_to_excel": full_path})
+    path_to_excel_cashed = full_path
+    logging.info(f"Selected Excel file: {full_path}")
+
+    return full_path
+
+
+def list_excels_in_dir() -> Optional[list[str]]:
     logging.info(f"Scanning directory: {dir_path}")
 
     os.makedirs(dir_path, exist_ok=True)
@@ -105,16 +163,21 @@ def get_path_to_excel() -> str:
 
     if not list_name_excels:
         logging.warning("No Excel files found in the directory.")
-        return None
 
-    first_excel = list_name_excels[0]
-    full_path = os.path.join(dir_path, first_excel)
+    return list_name_excels
 
-    config = save_config_sys({"path_to_excel": full_path})
-    path_to_excel_cashed = full_path
-    logging.info(f"Selected Excel file: {full_path}")
 
-    return full_path
+def get_paths_to_excels() -> list[str]:
+
+    if dataset_mode != DATASET_MODE_DIRECTORY:
+        path_excel = get_path_to_excel()
+        return [path_excel] if path_excel else []
+
+    list_name_excels = list_excels_in_dir()
+    if not list_name_excels:
+        return []
+
+    return [os.path.join(dir_path, name) for name in sorted(list_name_excels)]
 
 
 def filter_tec(df_lazy: pl.LazyFrame) -> pl.LazyFrame:
@@ -159,7 +222,7 @@ def create_dep_datetime(df_lazy: pl.LazyFrame) -> pl.LazyFrame:
 
 
 def apply_filters(
-    df: pl.LazyFrame, filters: FilterType, is_suggestions=False
+    df: pl.LazyFrame | pl.DataFrame, filters: FilterType, is_suggestions=False
 ) -> Tuple[pl.LazyFrame, Optional[pl.LazyFrame]]:
     logging.info("Applying filters to dataframe")
     total_df = None
@@ -213,6 +276,12 @@ def apply_filters(
             else pl.lit(max_total_dt)
         )
 
+    # a materialized base frame is sliced on its date index before any predicate
+    is_date_sliced = isinstance(df, pl.DataFrame)
+    if is_date_sliced:
+        logging.debug("Slicing base frame on date index: %s to %s", start, end)
+        df = get_date_index(df).slice(start, end).lazy()
+
     if code_delays:
         logging.info("Filtering by CODE_DR values: %s", code_delays)
         df = df.filter(pl.col("DELAY_CODE").is_in(code_delays))
@@ -256,11 +325,11 @@ def apply_filters(
         logging.info("No segmentation, using literal time range")
         df = df.with_columns(stmt_start, stmt_end)
 
-    if start:
+    if start and not is_date_sliced:
         logging.debug("Filtering from date: %s", start)
         df = df.filter(pl.col(COL_NAME_DEPARTURE_DATETIME) >= start)
 
-    if end:
+    if end and not is_date_sliced:
         logging.debug("Filtering to date: %s", end)
         df = df.filter(pl.col(COL_NAME_DEPARTURE_DATETIME) <= end)
 
@@ -269,50 +338,315 @@ def apply_filters(
 
 
 def load_excel_lazy(path_to_excel):
-    global df_unfiltered, df_raw, df, total_df
+    global loaded_sources, delay_code_dim, dataset_stats, load_generation
 
-    path_to_excel = get_path_to_excel()
-    if not path_to_excel:
+    paths_to_excels = get_paths_to_excels()
+    if not paths_to_excels:
         return None
 
-    df_read = pl.read_excel(path_to_excel).lazy()
+    start = time.perf_counter()
+
+    frames_excels = read_excel_snapshots(paths_to_excels)
+
+    df_read = concat_snapshots(list(frames_excels.values())).lazy()
+
+    # materialized once, every later query starts from clean and sorted data
+    new_df_raw, delay_code_dim = split_delay_code_dim(
+        materialize_base_df(preprocess_df(df_read))
+    )
+
+    new_df_unfiltered = materialize_base_df(
+        new_df_raw.lazy().pipe(filter_retard).pipe(filter_tec)
+    )
+
+    set_base_dfs(new_df_raw, new_df_unfiltered, build_cube_df(new_df_unfiltered))
+    # appends keep the generation, series built on older days stay valid
+    load_generation += 1
+
+    loaded_sources = {
+        path: describe_snapshot(path, frame) for path, frame in frames_excels.items()
+    }
+    dataset_stats = build_dataset_stats(
+        get_dataset_version(), df_raw, df_unfiltered, COL_NAME_DEPARTURE_DATETIME
+    )
+
+    # results of the previous dataset version can not be hit anymore
+    result_registry.clear()
+    dataset_load_seconds_metric.observe(time.perf_counter() - start, kind="full")
+    logging.info(f"Excel file(s) loaded and processed: {paths_to_excels}")
+
+
+def append_excel_rows() -> bool:
+    """Merge the rows appended to the workbooks into the loaded frames.
+
+    Returns False when rows already ingested changed or a workbook was
+    removed, the dataset then has to be reloaded from scratch.
+    """
+    global loaded_sources, delay_code_dim, dataset_stats
+
+    paths_to_excels = get_paths_to_excels()
+
+    if df_raw is None or not paths_to_excels:
+        return False
+
+    if any(path not in paths_to_excels for path in loaded_sources):
+        logging.info("A workbook was removed, a full reload is needed.")
+        return False
+
+    start = time.perf_counter()
+    new_sources = dict(loaded_sources)
+    appended_frames = []
+
+    for path in paths_to_excels:
+        previous = loaded_sources.get(path)
+
+        if previous is not None and previous.snapshot_key == get_snapshot_key(path):
+            continue
+
+        frame_excel = read_excel_snapshot(path)
+
+        if previous is None:
+            logging.info(f"New workbook in dataset: {path}")
+            appended_frames.append(frame_excel)
+        else:
+            unchanged_rows = get_unchanged_rows(frame_excel, previous)
+            if unchanged_rows is None:
+                return False
+            appended_frames.append(frame_excel.slice(unchanged_rows))
+
+        new_sources[path] = describe_snapshot(path, frame_excel)
+
+    if not appended_frames:
+        logging.info("No workbook changed, nothing to append.")
+        return True
+
+    df_read = concat_snapshots(appended_frames).lazy()
+
+    # only the appended rows go through the preprocessing
+    appended_raw, appended_dim = split_delay_code_dim(
+        materialize_base_df(preprocess_df(df_read))
+    )
+    appended_unfiltered = materialize_base_df(
+        appended_raw.lazy().pipe(filter_retard).pipe(filter_tec)
+    )
+
+    new_df_raw = merge_base_df(df_raw, appended_raw)
+    new_df_unfiltered = merge_base_df(df_unfiltered, appended_unfiltered)
+    # a cube key may now appear twice, readers always sum the counts
+    new_df_cube = merge_base_df(df_cube_unfiltered, build_cube_df(appended_unfiltered))
+    new_delay_code_dim = merge_delay_code_dim(delay_code_dim, appended_dim)
+
+    set_base_dfs(new_df_raw, new_df_unfiltered, new_df_cube)
+    loaded_sources, delay_code_dim = new_sources, new_delay_code_dim
+    dataset_stats = build_dataset_stats(
+        get_dataset_version(), df_raw, df_unfiltered, COL_NAME_DEPARTURE_DATETIME
+    )
+
+    # results of the previous dataset version can not be hit anymore
+    result_registry.clear()
+    dataset_load_seconds_metric.observe(time.perf_counter() - start, kind="append")
+    logging.info(f"Appended {appended_raw.height} row(s) to the loaded dataset")
+    return True
+
+
+def set_base_dfs(
+    new_df_raw: pl.DataFrame,
+    new_df_unfiltered: pl.DataFrame,
+    new_df_cube: pl.DataFrame,
+) -> None:
+    global df_raw, df_unfiltered, df_cube_unfiltered
+    global df_raw_index, df_unfiltered_index, df_cube_index
+
+    # frames and their indexes are swapped together, readers never mix them
+    df_raw_index = DateIndex(new_df_raw, COL_NAME_DEPARTURE_DATETIME)
+    df_unfiltered_index = DateIndex(new_df_unfiltered, COL_NAME_DEPARTURE_DATETIME)
+    df_cube_index = DateIndex(new_df_cube, COL_NAME_DEPARTURE_DATETIME)
+    df_raw, df_unfiltered, df_cube_unfiltered = (
+        new_df_raw,
+        new_df_unfiltered,
+        new_df_cube,
+    )
+
+
+def get_date_index(base_df: pl.DataFrame) -> DateIndex:
+    for index in (df_unfiltered_index, df_cube_index, df_raw_index):
+        if index is not None and index.df is base_df:
+            return index
+    return DateIndex(base_df, COL_NAME_DEPARTURE_DATETIME)
 
-    df_raw = preprocess_df(df_read)
 
-    df_unfiltered = df_raw.pipe(filter_retard).pipe(filter_tec)
+def build_cube_df(base_df: pl.DataFrame) -> pl.DataFrame:
+    """Daily cube of the flights, counted per CUBE_KEY_COLUMNS.
 
-    res = apply_filters(df_unfiltered, {})
-    if res:
-        df, total_df = res
-    logging.info(f"Excel file loaded and processed: {path_to_excel}")
+    It keeps the columns apply_filters works on, so the same filters and
+    windows apply, and calculations sum COL_NAME_FLIGHT_COUNT instead of
+    counting rows.
+    """
+    return materialize_base_df(
+        base_df.lazy()
+        .with_columns(
+            (pl.col("DELAY_TIME") > 15).fill_null(False).alias(COL_NAME_DELAY_GT_15MIN)
+        )
+        .group_by(CUBE_KEY_COLUMNS)
+        .agg(pl.len().alias(COL_NAME_FLIGHT_COUNT))
+    )
+
+
+def materialize_base_df(df_lazy: pl.LazyFrame) -> pl.DataFrame:
+    # sort sets the sorted flag, min/max and date windows can then use it
+    return df_lazy.sort(COL_NAME_DEPARTURE_DATETIME).collect()
+
+
+def merge_base_df(base_df: pl.DataFrame, appended_df: pl.DataFrame) -> pl.DataFrame:
+    merged_df = pl.concat([base_df, appended_df], how="diagonal_relaxed")
+
+    if base_df.is_empty() or appended_df.is_empty():
+        return merged_df.sort(COL_NAME_DEPARTURE_DATETIME)
+
+    base_max = base_df.get_column(COL_NAME_DEPARTURE_DATETIME).max()
+    appended_dates = appended_df.get_column(COL_NAME_DEPARTURE_DATETIME)
+
+    is_in_order = (
+        appended_dates.null_count() == 0
+        and base_max is not None
+        and appended_dates.min() >= base_max
+    )
+    if is_in_order:
+        # daily exports append later flights, no need to sort everything again
+        return merged_df.with_columns(pl.col(COL_NAME_DEPARTURE_DATETIME).set_sorted())
+
+    return merged_df.sort(COL_NAME_DEPARTURE_DATETIME)
 
 
 def preprocess_df(raw_df: pl.LazyFrame) -> pl.LazyFrame:
-    return raw_df.with_columns(
+    df = raw_df.with_columns(
         pl.col("DELAY_CODE").cast(pl.Int32).alias("DELAY_CODE")
     ).filter(pl.col("AC_REGISTRATION").str.starts_with("CN"))
 
+    if dataset_categorical:
+        columns = df.collect_schema().names()
+        # categoricals share one global dictionary and sort alphabetically
+        df = df.with_columns(
+            pl.col(col).cast(pl.Categorical)
+            for col in CATEGORICAL_COLUMNS
+            if col in columns
+        )
+
+    return df
 
-def get_df_unfiltered() -> Optional[pl.LazyFrame]:
+
+def split_delay_code_dim(
+    base_df: pl.DataFrame,
+) -> Tuple[pl.DataFrame, Optional[pl.DataFrame]]:
+    """Move the delay code descriptions out of the flight rows.
+
+    FAMILLE_DR stays on the flights as well, the analytics group by it.
+    """
+    dim_columns = [col for col in DELAY_CODE_DIM_COLUMNS if col in base_df.columns]
+    if "DELAY_CODE" not in dim_columns or len(dim_columns) == 1:
+        return base_df, None
+
+    dim_df = (
+        base_df.select(dim_columns)
+        .drop_nulls("DELAY_CODE")
+        .unique("DELAY_CODE", keep="first", maintain_order=True)
+        .sort("DELAY_CODE")
+    )
+    base_df = base_df.drop(
+        [col for col in DELAY_CODE_DIM_ONLY_COLUMNS if col in base_df.columns]
+    )
+    return base_df, dim_df
+
+
+def merge_delay_code_dim(
+    dim_df: Optional[pl.DataFrame], appended_dim_df: Optional[pl.DataFrame]
+) -> Optional[pl.DataFrame]:
+    if dim_df is None or appended_dim_df is None:
+        return dim_df if appended_dim_df is None else appended_dim_df
+
+    # codes already known keep their description
+    return (
+        pl.concat([dim_df, appended_dim_df], how="diagonal_relaxed")
+        .unique("DELAY_CODE", keep="first", maintain_order=True)
+        .sort("DELAY_CODE")
+    )
+
+
+def get_delay_code_dim() -> Optional[pl.DataFrame]:
+    global delay_code_dim
+
+    return delay_code_dim
+
+
+def get_df_unfiltered() -> Optional[pl.DataFrame]:
     global df_unfiltered
 
     path_excel = get_path_to_excel()
     if df_unfiltered is None and path_excel:
         update_df_unfiltered()
+    # kept eager so apply_filters can slice it on its date index
     return df_unfiltered
 
 
-def get_df() -> Optional[pl.LazyFrame]:
-    global df
-    if df is None:
+def compute_filtered_result(filters: Optional[FilterType]) -> FilteredResult:
+    filtered_df, filtered_total_df = apply_filters(df_unfiltered, filters or {})
+    filtered_cube_df, _ = apply_filters(df_cube_unfiltered, filters or {}, True)
+
+    return {
+        "df": filtered_df.collect(),
+        "total_df": (
+            filtered_total_df.collect() if filtered_total_df is not None else None
+        ),
+        "cube_df": filtered_cube_df.collect(),
+    }
+
+
+def get_filtered_result(filters: Optional[FilterType]) -> Optional[FilteredResult]:
+    """Collected frames of the filters, computed once per dataset version."""
+    if df_unfiltered is None or df_cube_unfiltered is None:
         return None
-    return df
 
+    key = (get_filter_fingerprint(filters), get_dataset_version())
+    return result_registry.get_or_compute(key, lambda: compute_filtered_result(filters))
 
-def get_total_df() -> Optional[pl.LazyFrame]:
-    global total_df
 
-    return total_df
+def get_df(filters: Optional[FilterType] = None) -> Optional[pl.LazyFrame]:
+    result = get_filtered_result(filters)
+    if result is None:
+        return None
+    return result["df"].lazy()
+
+
+def get_df_raw() -> Optional[pl.DataFrame]:
+    global df_raw
+
+    return df_raw
+
+
+def get_load_generation() -> int:
+    global load_generation
+
+    return load_generation
+
+
+def get_cube_df_unfiltered() -> Optional[pl.DataFrame]:
+    global df_cube_unfiltered
+
+    return df_cube_unfiltered
+
+
+def get_cube_df(filters: Optional[FilterType] = None) -> Optional[pl.LazyFrame]:
+    result = get_filtered_result(filters)
+    if result is None:
+        return None
+    return result["cube_df"].lazy()
+
+
+def get_total_df(filters: Optional[FilterType] = None) -> Optional[pl.LazyFrame]:
+    result = get_filtered_result(filters)
+    if result is None or result["total_df"] is None:
+        return None
+    return result["total_df"].lazy()
 
 
 def get_count_df(
@@ -320,7 +654,6 @@ def get_count_df(
 ) -> Optional[pl.LazyFrame]:
     global df_raw
     start = end = None
-    filter_list = []
 
     if min_date:
         start = (
@@ -328,7 +661,6 @@ def get_count_df(
             if isinstance(min_date, date)
             else datetime.fromisoformat(min_date).date()
         )
-        filter_list.append(pl.col(COL_NAME_DEPARTURE_DATETIME) >= start)
         logging.debug(f"Applying min_date filter: {start}")
 
     if max_date:
@@ -337,13 +669,17 @@ def get_count_df(
             if isinstance(max_date, date)
             else datetime.fromisoformat(max_date).date()
         )
-        filter_list.append(pl.col(COL_NAME_DEPARTURE_DATETIME) <= end)
         logging.debug(f"Applying max_date filter: {end}")
 
-    stmt = df_raw
-    if filter_list:
-        stmt = df_raw.filter(filter_list)
-        logging.debug(f"Filtered df_raw with {len(filter_list)} filter(s).")
+    # the totals come from the flights per day of the index, not from df_raw
+    days, counts = get_date_index(df_raw).count_per_day(start, end)
+    stmt = pl.LazyFrame(
+        {COL_NAME_DEPARTURE_DATETIME: days, COL_NAME_TOTAL_COUNT: counts},
+        schema={
+            COL_NAME_DEPARTURE_DATETIME: df_raw.schema[COL_NAME_DEPARTURE_DATETIME],
+            COL_NAME_TOTAL_COUNT: pl.UInt32,
+        },
+    )
 
     if segmentation and unit_segmentation:
 
@@ -360,7 +696,7 @@ def get_count_df(
                 .alias(COL_NAME_WINDOW_TIME),
             )
             .group_by(COL_NAME_WINDOW_TIME)
-            .agg(pl.len().alias(COL_NAME_TOTAL_COUNT))
+            .agg(pl.col(COL_NAME_TOTAL_COUNT).sum())
             .with_columns(
                 pl.col(COL_NAME_WINDOW_TIME)
                 .dt.offset_by(max_segmentation)
@@ -384,7 +720,7 @@ def get_count_df(
         stmt_start = stmt_start.alias(COL_NAME_WINDOW_TIME)
         stmt_end = stmt_end.alias(COL_NAME_WINDOW_TIME_MAX)
 
-        stmt = stmt.select([stmt_start, stmt_end, pl.len().alias(COL_NAME_TOTAL_COUNT)])
+        stmt = stmt.select([stmt_start, stmt_end, pl.col(COL_NAME_TOTAL_COUNT).sum()])
 
     return stmt
 
@@ -420,19 +756,47 @@ def get_latest_modification_time():
     path_excel = get_path_to_excel()
     if not path_excel:
         return None
-    latest_modification_timestamp = os.path.getmtime(path_excel)
+
+    if dataset_mode == DATASET_MODE_DIRECTORY:
+        # the directory mtime moves when a workbook is added or removed
+        latest_modification_timestamp = max(
+            os.path.getmtime(path) for path in [dir_path, *get_paths_to_excels()]
+        )
+    else:
+        latest_modification_timestamp = os.path.getmtime(path_excel)
     readable_time = datetime.fromtimestamp(latest_modification_timestamp)
     readable_time = readable_time.strftime("%Y-%m-%d %H:%M:%S")
 
     return readable_time
 
 
+def get_dataset_version() -> Optional[str]:
+    global loaded_sources
+
+    if not loaded_sources:
+        return None
+
+    snapshot_keys = sorted(source.snapshot_key for source in loaded_sources.values())
+    return hashlib.sha1("|".join(snapshot_keys).encode("utf-8")).hexdigest()[:16]
+
+
+def get_dataset_stats() -> Optional[DatasetStats]:
+    global dataset_stats
+
+    return dataset_stats
+
+
 def get_min_max_date_raw_df() -> tuple:
-    global df_raw
+    global df_raw, dataset_stats
+
+    if dataset_stats is not None:
+        return dataset_stats.raw.min_date, dataset_stats.raw.max_date
+
+    # df_raw is sorted, min and max only read both ends of the column
     min_max_date = df_raw.select(
         pl.col(COL_NAME_DEPARTURE_DATETIME).min().alias("min_date"),
         pl.col(COL_NAME_DEPARTURE_DATETIME).max().alias("max_date"),
-    ).collect()
+    )
     logging.debug("Min and max dates from raw DataFrame: %s", min_max_date)
 
     return min_max_date["min_date"][0], min_max_date["max_date"][0]
@@ -440,10 +804,22 @@ def get_min_max_date_raw_df() -> tuple:
 
 # program
 
-df_raw: pl.LazyFrame = None
-df_unfiltered: pl.LazyFrame = None
-df: pl.LazyFrame = None
-total_df: pl.LazyFrame = None
+df_raw: pl.DataFrame = None
+df_raw_index: DateIndex = None
+df_unfiltered_index: DateIndex = None
+df_cube_unfiltered: pl.DataFrame = None
+df_cube_index: DateIndex = None
+loaded_sources: dict[str, SnapshotSource] = {}
+delay_code_dim: pl.DataFrame = None
+dataset_stats: Optional[DatasetStats] = None
+df_unfiltered: pl.DataFrame = None
+load_generation = 0
+
+dataset_load_seconds_metric = HistogramMetric(
+    "dashboard_dataset_load_seconds",
+    "Time spent loading the workbooks, fully or by appending new rows.",
+    ("kind",),
+)
 
 path_to_excel = get_path_to_excel()
 if path_to_excel and path_to_excel.strip() != "":
@@ -455,12 +831,10 @@ if path_to_excel and path_to_excel.strip() != "":
         path_to_excel_cashed = ""
         df_unfiltered = None
         df_raw = None
-        df = None
 else:
     logging.info("No Excel path configured. Please set a path in the Settings page.")
     df_unfiltered = None
     df_raw = None
-    df = None
 
 modification_date = get_modification_time_cashed()
 
@@ -471,12 +845,10 @@ store_latest_date_fetch = dcc.Store(
 )
 
 store_trigger_change = dcc.Store(id=ID_DATA_STORE_TRIGGER)
-interval_watcher = dcc.Interval(id=ID_INTERVAL_WATCHER, interval=1000)
 
 hookers = [
     store_excel,
     store_latest_date_fetch,
-    interval_watcher,
     store_trigger_change,
     store_trigger_status,
 ]
@@ -493,6 +865,12 @@ def add_watcher_for_data():
 def update_df_unfiltered():
     global path_to_excel_cashed
     logging.info("Updating unfiltered dataframe by reloading Excel file")
+    try:
+        if append_excel_rows():
+            return
+    except Exception as e:
+        logging.warning(f"Could not append rows, reloading everything: {e}")
+
     try:
         load_excel_lazy(get_path_to_excel())
     except Exception as e:
@@ -508,15 +886,6 @@ def modify_modification_date(new_modification_date: float):
     logging.info(f"Set modification date to: {new_modification_date}")
 
 
-def update_df(filtred_df: pl.LazyFrame, filtered_total_df: pl.LazyFrame):
-    global df, total_df
-    logging.info("Updated DataFrame with new filtered data.")
-
-    df = filtred_df
-    total_df = filtered_total_df
-    logging.info("Updated DataFrame with new data.")
-
-
 def add_callbacks():
 
     @app.callback(
@@ -0,0 +1,119 @@
+from collections import OrderedDict
+import logging
+import sys
+import threading
+import time
+from typing import Any, Optional, Tuple
+
+import polars as pl
+
+# size given to values whose memory can not be measured, like a query plan
+UNSIZED_VALUE_BYTES = 1024
+
+
+def estimate_size(value: Any) -> int:
+    if isinstance(value, pl.DataFrame):
+        return value.estimated_size()
+    if isinstance(value, pl.Series):
+        return value.estimated_size()
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(key) + estimate_size(item) for key, item in value.items()
+        )
+    if isinstance(value, pl.LazyFrame):
+        return UNSIZED_VALUE_BYTES
+    return sys.getsizeof(value)
+
+
+class TierStats:
+    """Hits, misses and time spent in one cache tier."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.seconds = 0.0
+
+    def record(self, hit: bool, seconds: float) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            self.seconds += seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "mean_latency_ms": self.seconds * 1000 / lookups if lookups else 0.0,
+            }
+
+
+class LocalCache:
+    """In-process LRU bounded in bytes, with a time to live per entry."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, Tuple[Any, int, Optional[float]]] = (
+            OrderedDict()
+        )
+        self._total_bytes = 0
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            value, size, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                self._total_bytes -= size
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, expire_seconds: Optional[int] = None) -> bool:
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            logging.debug(f"Value of '{key}' is larger than the local cache")
+            return False
+
+        expires_at = time.monotonic() + expire_seconds if expire_seconds else None
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= previous[1]
+
+            self._entries[key] = (value, size, expires_at)
+            self._total_bytes += size
+
+            while self._total_bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+        return True
+
+    def delete_prefix(self, prefix: str) -> int:
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                self._total_bytes -= self._entries.pop(key)[1]
+        return len(keys)
+
+    def get_usage(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
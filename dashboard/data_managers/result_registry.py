@@ -0,0 +1,126 @@
+from collections import OrderedDict
+from concurrent.futures import Future
+import logging
+import threading
+from typing import Callable, Optional, Tuple
+
+from configurations.config import get_base_config
+from schemas.filter import FilteredResult
+
+RegistryKey = Tuple[str, Optional[str]]
+
+# init
+
+base_config = get_base_config()
+
+registry_max_entries = base_config.get("registry", {}).get("max_entries", 32)
+registry_max_megabytes = base_config.get("registry", {}).get("max_megabytes", 512)
+
+# func
+
+
+def get_result_size(result: FilteredResult) -> int:
+    return sum(frame.estimated_size() for frame in result.values() if frame is not None)
+
+
+class ResultRegistry:
+    """Thread safe LRU of the collected filtered frames.
+
+    Entries are keyed by filter fingerprint and dataset version, and evicted
+    least recently used first once there are too many or they take too much
+    memory. Concurrent misses on one key compute it once, the other callers
+    wait for that result.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[RegistryKey, Tuple[FilteredResult, int]] = (
+            OrderedDict()
+        )
+        self._total_bytes = 0
+        self._inflight: dict[RegistryKey, Future] = {}
+
+    def get(self, key: RegistryKey) -> Optional[FilteredResult]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: RegistryKey, result: FilteredResult) -> None:
+        size = get_result_size(result)
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= previous[1]
+
+            self._entries[key] = (result, size)
+            self._total_bytes += size
+
+            # the entry just added always stays, even alone over the limit
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries
+                or self._total_bytes > self.max_bytes
+            ):
+                evicted_key, (_, evicted_size) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+                logging.debug(f"Evicted filtered result {evicted_key}")
+
+    def get_or_compute(
+        self, key: RegistryKey, compute: Callable[[], FilteredResult]
+    ) -> FilteredResult:
+        result = self.get(key)
+        if result is not None:
+            logging.debug(f"Filtered result hit for {key}")
+            return result
+
+        with self._lock:
+            future = self._inflight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not is_leader:
+            logging.debug(f"Filtered result {key} is computed, waiting.")
+            return future.result()
+
+        try:
+            # it may have been stored between the miss and the claim
+            result = self.get(key)
+            if result is None:
+                logging.debug(f"Filtered result miss for {key}, computing it")
+                result = compute()
+                self.put(key, result)
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def get_usage(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+result_registry = ResultRegistry(
+    max_entries=registry_max_entries,
+    max_bytes=registry_max_megabytes * 1024 * 1024,
+)
@@ -0,0 +1,257 @@
+from concurrent.futures import ThreadPoolExecutor
+import glob
+import hashlib
+import logging
+import os
+import subprocess
+import sys
+from typing import Optional
+
+import polars as pl
+
+from configurations.config import get_base_config, get_cache_dir_sys
+from schemas.snapshot import SnapshotSource
+
+SNAPSHOT_DIR_NAME = "snapshots"
+
+# the worker module is run from the dashboard directory, see run_snapshot_worker
+DASHBOARD_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SNAPSHOT_FORMATS = {
+    "parquet": ".parquet",
+    "ipc": ".arrow",
+}
+
+# init
+
+base_config = get_base_config()
+
+snapshot_format = base_config.get("snapshot", {}).get("format", "parquet")
+snapshot_compression = base_config.get("snapshot", {}).get("compression", "zstd")
+snapshot_workers = base_config.get("snapshot", {}).get("workers", 4)
+
+if snapshot_format not in SNAPSHOT_FORMATS:
+    logging.warning(
+        f"Unknown snapshot format '{snapshot_format}', falling back to parquet."
+    )
+    snapshot_format = "parquet"
+
+# func
+
+
+def get_snapshot_dir() -> str:
+    path_snapshot_dir = os.path.join(get_cache_dir_sys(), SNAPSHOT_DIR_NAME)
+    os.makedirs(path_snapshot_dir, exist_ok=True)
+    return path_snapshot_dir
+
+
+def get_source_id(path_to_excel: str) -> str:
+    source = os.path.normcase(os.path.abspath(path_to_excel))
+    return hashlib.sha1(source.encode("utf-8")).hexdigest()[:16]
+
+
+def get_snapshot_key(path_to_excel: str) -> str:
+    stat = os.stat(path_to_excel)
+    source = os.path.normcase(os.path.abspath(path_to_excel))
+    raw_key = f"{source}|{stat.st_size}|{stat.st_mtime_ns}"
+    return hashlib.sha1(raw_key.encode("utf-8")).hexdigest()[:16]
+
+
+def get_snapshot_path(path_to_excel: str) -> str:
+    extension = SNAPSHOT_FORMATS[snapshot_format]
+    name = f"{get_source_id(path_to_excel)}_{get_snapshot_key(path_to_excel)}"
+    return os.path.join(get_snapshot_dir(), name + extension)
+
+
+def delete_stale_snapshots(path_to_excel: str, keep: Optional[str] = None) -> int:
+    pattern = os.path.join(get_snapshot_dir(), f"{get_source_id(path_to_excel)}_*")
+
+    deleted = 0
+    for snapshot_path in glob.glob(pattern):
+        if keep and os.path.samefile(snapshot_path, keep):
+            continue
+        try:
+            os.remove(snapshot_path)
+            deleted += 1
+            logging.debug(f"Deleted stale snapshot: {snapshot_path}")
+        except OSError as e:
+            logging.warning(f"Could not delete stale snapshot {snapshot_path}: {e}")
+    return deleted
+
+
+def write_snapshot(df: pl.DataFrame, snapshot_path: str) -> None:
+    tmp_path = snapshot_path + ".tmp"
+
+    if snapshot_format == "ipc":
+        df.write_ipc(tmp_path, compression=snapshot_compression)
+    else:
+        df.write_parquet(tmp_path, compression=snapshot_compression)
+
+    # atomic swap so a concurrent reader never sees a half written file
+    os.replace(tmp_path, snapshot_path)
+
+
+def scan_snapshot_file(snapshot_path: str) -> pl.LazyFrame:
+    if snapshot_format == "ipc":
+        return pl.scan_ipc(snapshot_path)
+    return pl.scan_parquet(snapshot_path)
+
+
+def get_rows_fingerprint(df: pl.DataFrame) -> str:
+    # hash_rows is only stable within a polars version, never persist this
+    row_hashes = df.hash_rows(seed=0).to_numpy()
+    return hashlib.blake2b(row_hashes.tobytes(), digest_size=16).hexdigest()
+
+
+def save_snapshot(path_to_excel: str, df: pl.DataFrame) -> str:
+    snapshot_path = get_snapshot_path(path_to_excel)
+
+    write_snapshot(df, snapshot_path)
+
+    deleted = delete_stale_snapshots(path_to_excel, keep=snapshot_path)
+    logging.info(
+        f"Snapshot built with {df.height} rows, removed {deleted} stale snapshot(s)"
+    )
+    return snapshot_path
+
+
+def build_snapshot(path_to_excel: str) -> str:
+    logging.info(f"Building snapshot of {path_to_excel}")
+    df = pl.read_excel(path_to_excel)
+    return save_snapshot(path_to_excel, df)
+
+
+def run_snapshot_worker(path_to_excel: str) -> str:
+    # a new interpreter only imports this module, never root.py and the app
+    subprocess.run(
+        [sys.executable, "-m", "data_managers.snapshot_manager", path_to_excel],
+        cwd=DASHBOARD_DIR,
+        check=True,
+    )
+    return get_snapshot_path(path_to_excel)
+
+
+def is_snapshot_current(path_to_excel: str) -> bool:
+    return os.path.isfile(get_snapshot_path(path_to_excel))
+
+
+def describe_snapshot(path_to_excel: str, df: pl.DataFrame) -> SnapshotSource:
+    return SnapshotSource(
+        snapshot_key=get_snapshot_key(path_to_excel),
+        rows=df.height,
+        fingerprint=get_rows_fingerprint(df),
+    )
+
+
+def get_unchanged_rows(df: pl.DataFrame, previous: SnapshotSource) -> Optional[int]:
+    """Number of leading rows of df identical to the previous snapshot.
+
+    None means rows that were already ingested changed (or were removed),
+    so appending the tail is not enough and a full reload is needed.
+    """
+    if previous.rows > df.height:
+        logging.info(f"Workbook lost rows ({previous.rows} -> {df.height})")
+        return None
+
+    if get_rows_fingerprint(df.head(previous.rows)) != previous.fingerprint:
+        logging.info("Rows already ingested have changed")
+        return None
+
+    logging.info(
+        f"Workbook only appended {df.height - previous.rows} row(s) "
+        f"after {previous.rows} unchanged row(s)"
+    )
+    return previous.rows
+
+
+def read_excel_snapshot(path_to_excel: str) -> pl.DataFrame:
+    """Read the snapshot of the workbook in memory, building it if the source changed."""
+    if not is_snapshot_current(path_to_excel):
+        logging.info(f"Building snapshot of {path_to_excel}")
+        df = pl.read_excel(path_to_excel)
+        try:
+            save_snapshot(path_to_excel, df)
+        except OSError as e:
+            logging.error(f"Could not save snapshot of {path_to_excel}: {e}")
+        return df
+
+    return scan_excel_snapshot(path_to_excel).collect()
+
+
+def scan_excel_snapshot(path_to_excel: str) -> pl.LazyFrame:
+    """Scan the columnar snapshot of the workbook, building it if the source changed."""
+    try:
+        if is_snapshot_current(path_to_excel):
+            snapshot_path = get_snapshot_path(path_to_excel)
+            logging.info(f"Using snapshot: {snapshot_path}")
+        else:
+            snapshot_path = build_snapshot(path_to_excel)
+
+        return scan_snapshot_file(snapshot_path)
+    except OSError as e:
+        logging.error(
+            f"Snapshot unavailable for {path_to_excel}, reading workbook directly: {e}",
+            exc_info=True,
+        )
+        return pl.read_excel(path_to_excel).lazy()
+
+
+def build_snapshots(paths_to_excels: list[str]) -> None:
+    """Build the missing snapshots, parsing each workbook in its own process.
+
+    The workers run this module alone, a frozen build has no interpreter to
+    run it with and parses in threads instead.
+    """
+    missing_paths = [
+        path for path in paths_to_excels if not is_snapshot_current(path)
+    ]
+
+    if not missing_paths:
+        logging.info("All snapshots are up to date.")
+        return
+
+    logging.info(f"Building {len(missing_paths)} snapshot(s): {missing_paths}")
+
+    if len(missing_paths) == 1 or snapshot_workers <= 1:
+        for path in missing_paths:
+            build_snapshot(path)
+        return
+
+    build = build_snapshot if getattr(sys, "frozen", False) else run_snapshot_worker
+    try:
+        max_workers = min(snapshot_workers, len(missing_paths))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for snapshot_path in executor.map(build, missing_paths):
+                logging.debug(f"Snapshot ready: {snapshot_path}")
+    except (subprocess.CalledProcessError, OSError) as e:
+        logging.warning(
+            f"Parallel snapshot build failed, building sequentially: {e}",
+            exc_info=True,
+        )
+        for path in missing_paths:
+            if not is_snapshot_current(path):
+                build_snapshot(path)
+
+
+def read_excel_snapshots(paths_to_excels: list[str]) -> dict[str, pl.DataFrame]:
+    """Read every workbook of the dataset in memory, one frame per workbook."""
+    if len(paths_to_excels) > 1:
+        try:
+            build_snapshots(paths_to_excels)
+        except OSError as e:
+            logging.error(f"Could not build snapshots: {e}", exc_info=True)
+
+    return {path: read_excel_snapshot(path) for path in paths_to_excels}
+
+
+def concat_snapshots(frames: list[pl.DataFrame]) -> pl.DataFrame:
+    if len(frames) == 1:
+        return frames[0]
+    # monthly exports may drift slightly in schema, align them column wise
+    return pl.concat(frames, how="diagonal_relaxed")
+
+
+if __name__ == "__main__":
+    # started by run_snapshot_worker for one workbook
+    logging.basicConfig(level=logging.INFO)
+    build_snapshot(sys.argv[1])
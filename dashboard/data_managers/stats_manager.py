@@ -0,0 +1,137 @@
+import glob
+import logging
+import os
+from typing import Optional
+
+import polars as pl
+from pydantic import ValidationError
+
+from configurations.config import get_base_config
+from data_managers.snapshot_manager import get_snapshot_dir
+from schemas.dataset_stats import ColumnStats, DatasetStats, FrameStats
+
+STATS_FILE_PREFIX = "stats_"
+
+# init
+
+base_config = get_base_config()
+
+max_distinct_values = base_config.get("stats", {}).get("max_distinct_values", 5000)
+
+# func
+
+
+def get_stats_path(dataset_version: str) -> str:
+    return os.path.join(
+        get_snapshot_dir(), f"{STATS_FILE_PREFIX}{dataset_version}.json"
+    )
+
+
+def has_distinct_values(dtype: pl.DataType) -> bool:
+    return dtype in (pl.String, pl.Categorical) or dtype.is_integer()
+
+
+def build_frame_stats(df: pl.DataFrame, date_column: str) -> FrameStats:
+    # one pass for the counts of every column
+    counts = df.select(
+        *(pl.col(col).null_count().alias(f"{col}__nulls") for col in df.columns),
+        *(pl.col(col).n_unique().alias(f"{col}__distinct") for col in df.columns),
+    ).row(0, named=True)
+
+    columns = {}
+    for col, dtype in df.schema.items():
+        distinct_count = counts[f"{col}__distinct"]
+        distinct_values = None
+
+        if has_distinct_values(dtype) and distinct_count <= max_distinct_values:
+            distinct_values = (
+                df.get_column(col)
+                .drop_nulls()
+                .unique()
+                .cast(pl.String if dtype == pl.Categorical else dtype)
+                .sort()
+                .to_list()
+            )
+
+        columns[col] = ColumnStats(
+            null_count=counts[f"{col}__nulls"],
+            distinct_count=distinct_count,
+            distinct_values=distinct_values,
+        )
+
+    min_date = max_date = None
+    if date_column in df.columns:
+        dates = df.get_column(date_column)
+        min_date, max_date = dates.min(), dates.max()
+
+    return FrameStats(
+        total_rows=df.height,
+        min_date=min_date,
+        max_date=max_date,
+        columns=columns,
+    )
+
+
+def delete_stale_stats(keep: str) -> None:
+    pattern = os.path.join(get_snapshot_dir(), f"{STATS_FILE_PREFIX}*.json")
+    for stats_path in glob.glob(pattern):
+        if os.path.basename(stats_path) == os.path.basename(keep):
+            continue
+        try:
+            os.remove(stats_path)
+            logging.debug(f"Deleted stale statistics: {stats_path}")
+        except OSError as e:
+            logging.warning(f"Could not delete stale statistics {stats_path}: {e}")
+
+
+def save_dataset_stats(dataset_stats: DatasetStats) -> None:
+    stats_path = get_stats_path(dataset_stats.dataset_version)
+    tmp_path = stats_path + ".tmp"
+
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(dataset_stats.model_dump_json())
+    os.replace(tmp_path, stats_path)
+
+    delete_stale_stats(keep=stats_path)
+
+
+def read_dataset_stats(dataset_version: str) -> Optional[DatasetStats]:
+    stats_path = get_stats_path(dataset_version)
+    if not os.path.isfile(stats_path):
+        return None
+
+    try:
+        with open(stats_path, "r", encoding="utf-8") as f:
+            return DatasetStats.model_validate_json(f.read())
+    except (OSError, ValidationError) as e:
+        logging.warning(f"Could not read statistics {stats_path}: {e}")
+        return None
+
+
+def get_dataset_stats(
+    dataset_version: Optional[str],
+    df_raw: pl.DataFrame,
+    df_unfiltered: pl.DataFrame,
+    date_column: str,
+) -> Optional[DatasetStats]:
+    """Statistics catalog of the dataset version, read from disk or built."""
+    if dataset_version is None:
+        return None
+
+    dataset_stats = read_dataset_stats(dataset_version)
+    if dataset_stats is not None:
+        logging.info(f"Using statistics catalog of dataset {dataset_version}")
+        return dataset_stats
+
+    dataset_stats = DatasetStats(
+        dataset_version=dataset_version,
+        raw=build_frame_stats(df_raw, date_column),
+        unfiltered=build_frame_stats(df_unfiltered, date_column),
+    )
+    try:
+        save_dataset_stats(dataset_stats)
+    except OSError as e:
+        logging.error(f"Could not save statistics catalog: {e}")
+
+    logging.info(f"Statistics catalog built for dataset {dataset_version}")
+    return dataset_stats
@@ -1,72 +1,115 @@
-import os
-import dash
+import threading
+import time
+from typing import Optional
 import logging
 
-from dash import Input, Output, State
+from flask import jsonify
 
-from data_managers.cache_manager import delete_old_keys
-from schemas.data_status import StatusData
+from configurations.config import get_base_config
+from data_managers.cache_manager import bump_cache_epoch
+from data_managers.cache_warmer import get_warmer_progress, start_cache_warmer
 from data_managers.excel_manager import (
-    ID_INTERVAL_WATCHER,
-    ID_PATH_STORE,
-    ID_STORE_DATE_WATCHER,
-    add_state_for_data_status,
+    get_dataset_version,
     get_latest_modification_time,
     get_path_to_excel,
     modify_modification_date,
     update_df_unfiltered,
 )
-from server_instance import get_app
+from server_instance import get_server
+from status.dataset_version_manager import get_dataset_state, publish_dataset_state
 
+# keep in sync with assets/dataset_watcher.js
+ROUTE_DATASET_VERSION = "/_dataset/version"
+ROUTE_CACHE_WARMER = "/_cache/warmer"
 
-app = get_app()
+server = get_server()
 
+base_config = get_base_config()
 
-def add_callbacks():
-    @app.callback(
-        Output(ID_PATH_STORE, "data"),
-        Output(ID_STORE_DATE_WATCHER, "data", allow_duplicate=True),
-        State(ID_PATH_STORE, "data"),
-        State(ID_STORE_DATE_WATCHER, "data"),
-        Input(ID_INTERVAL_WATCHER, "n_intervals"),
-        add_state_for_data_status(),
-        prevent_initial_call=True,
+watcher_interval_seconds = base_config.get("watcher", {}).get("interval_seconds", 1)
+poll_interval_seconds = base_config.get("watcher", {}).get("poll_interval_seconds", 2)
+
+watcher_thread: Optional[threading.Thread] = None
+_watcher_lock = threading.Lock()
+
+watched_path: Optional[str] = None
+watched_modification_time: Optional[str] = None
+
+
+def watch_file():
+    global watched_path, watched_modification_time
+
+    path_to_excel = get_path_to_excel()
+    latest_modification_time = get_latest_modification_time()
+
+    if (path_to_excel == watched_path) and (
+        latest_modification_time == watched_modification_time
+    ):
+        return
+
+    if not path_to_excel:
+        logging.warning("Excel file path no longer exists.")
+    else:
+        logging.info("File changed, updating DataFrame...")
+        update_df_unfiltered()
+        modify_modification_date(latest_modification_time)
+
+    bump_cache_epoch(get_dataset_version())
+    start_cache_warmer(get_dataset_version())
+
+    watched_path, watched_modification_time = path_to_excel, latest_modification_time
+
+    changed = publish_dataset_state(
+        get_dataset_version(), path_to_excel, latest_modification_time
     )
-    def watch_file(current_path, date_latest_fetch, _, old_status):
-        logging.debug("Watching file every second...")
-        try:
-            # Check if file path exists
-            if (not current_path) or (not os.path.exists(current_path)):
-                logging.warning("Excel file path no longer exists.")
-
-                path_to_excel, latest_modification_time = (
-                    get_path_to_excel(),
-                    get_latest_modification_time(),
-                )
-                new_status: StatusData = "selected" if path_to_excel else "unselected"
-                if old_status != new_status:
-                    delete_old_keys()
-
-                    return path_to_excel, latest_modification_time
-                else:
-                    return dash.no_update
-            # Check for modification time
-            latest_modification_time = get_latest_modification_time()
-            logging.debug(
-                f"watching file: {latest_modification_time} new: {date_latest_fetch}"
-            )
-            if latest_modification_time != date_latest_fetch:
-                logging.info("File changed, updating DataFrame...")
-                delete_old_keys()
-                update_df_unfiltered()
+    logging.info(f"Dataset state published, changed: {changed}")
 
-                modify_modification_date(latest_modification_time)
-                return dash.no_update, latest_modification_time
 
+def background_file_watcher(interval_seconds=1):
+    global watched_path, watched_modification_time
+
+    # the data was loaded at import, start from what is on disk now
+    watched_path = get_path_to_excel()
+    watched_modification_time = get_latest_modification_time()
+    publish_dataset_state(
+        get_dataset_version(), watched_path, watched_modification_time
+    )
+    start_cache_warmer(get_dataset_version())
+
+    while True:
+        try:
+            watch_file()
         except FileNotFoundError:
             logging.warning("Excel file not found during watch.")
-
         except Exception as e:
             logging.error(f"Error watching file: {e}", exc_info=True)
+        time.sleep(interval_seconds)
+
+
+def start_file_watcher_thread():
+    global watcher_thread
+    with _watcher_lock:
+        if watcher_thread is None:
+            logging.info("Starting background Excel watcher thread")
+            watcher_thread = threading.Thread(
+                target=background_file_watcher,
+                args=(watcher_interval_seconds,),
+                daemon=True,
+            )
+            watcher_thread.start()
+
+
+def add_callbacks():
+
+    @server.route(ROUTE_DATASET_VERSION)
+    def dataset_version():
+        # only reads the published state, the tabs poll it on an interval
+        return jsonify(
+            {**get_dataset_state(), "poll_interval_seconds": poll_interval_seconds}
+        )
+
+    @server.route(ROUTE_CACHE_WARMER)
+    def cache_warmer_progress():
+        return jsonify(get_warmer_progress())
 
-        return dash.no_update
+    start_file_watcher_thread()
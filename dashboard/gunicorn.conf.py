@@ -0,0 +1,5 @@
+# each thread serves one request at a time, a dash callback holds it while it
+# computes, so workers * threads callbacks run at once and the rest queue.
+# the dataset watcher requests are answered right away and do not hold one.
+worker_class = "gthread"
+threads = 16
@@ -18,6 +18,7 @@ from calculations.analytics import (
     prepare_registration_family_data,
     prepare_subtype_family_data,
 )
+from data_managers.cache_manager import get_cached_results
 from data_managers.excel_manager import (
     COL_NAME_WINDOW_TIME,
     COL_NAME_WINDOW_TIME_MAX,
@@ -255,17 +256,28 @@ layout = dbc.Container(
     add_watcher_for_data(),
     prevent_initial_call=False,
 )
-def update_plots_tables(n_clicks):
+def update_plots_tables(filters):
     # --- Prepare data ---
-    temporal_all, famille_share_df = prepare_delay_data()
-    subtype_family_percentage_df = prepare_subtype_family_data()
-    df_pers_by_registration_by_family = prepare_registration_family_data()
+    # one round trip to the cache, the misses share one filtered frame
+    (
+        (temporal_all, famille_share_df),
+        subtype_family_percentage_df,
+        df_pers_by_registration_by_family,
+        summary,
+    ) = get_cached_results(
+        [
+            prepare_delay_data,
+            prepare_subtype_family_data,
+            prepare_registration_family_data,
+            analyze_summery,
+        ],
+        filters,
+    )
 
     if temporal_all is None or temporal_all.is_empty():
         return dash.no_update
 
     # --- Stats ---
-    summary = analyze_summery()
     unique_codes = summary.height if not summary.is_empty() else 0
     total_delays = summary["Occurrences"].sum() if not summary.is_empty() else 0
 
@@ -506,7 +518,7 @@ add_export_callbacks(
 
 register_navbar_callback(
     id_prefix=ID_NAVBAR_FAMILY,
-    get_df_fn=lambda: prepare_delay_data()[0],
+    get_df_fn=lambda filters: prepare_delay_data(filters)[0],
     tabs_col="FAMILLE_DR",
     x=COL_NAME_WINDOW_TIME,
     x_max=COL_NAME_WINDOW_TIME_MAX,
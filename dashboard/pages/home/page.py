@@ -27,6 +27,7 @@ from calculations.main_dashboard import (
 from utils_dashboard.utils_download import add_export_callbacks
 from server_instance import get_app
 from data_managers.excel_manager import (
+    get_cube_df,
     get_df,
     add_watcher_for_data,
     COL_NAME_WINDOW_TIME_MAX,
@@ -335,8 +336,8 @@ layout = dbc.Container(
     Output(ID_SUMMERY_TABLE, "data"),
     add_watcher_for_data(),
 )
-def update_summary(_):
-    df_lazy = get_df()
+def update_summary(filters):
+    df_lazy = get_df(filters)
     if df_lazy is None:
         alert = dbc.Alert(
             "No Excel file loaded. Please upload first.",
@@ -378,8 +379,8 @@ def update_summary(_):
     Output(ID_TABLE_SUBTYPE_PR_DELAY_MEAN, "data"),
     add_watcher_for_data(),
 )
-def update_subtype(_):
-    df_lazy = get_df()
+def update_subtype(filters):
+    df_lazy = get_cube_df(filters)
     if df_lazy is None:
         return go.Figure(), [], []
     df_sub = process_subtype_pct_data(df_lazy).collect()
@@ -416,11 +417,11 @@ def update_subtype(_):
     Output(ID_TABLE_CATEGORY_DELAY_GT_15MIN, "data"),
     add_watcher_for_data(),
 )
-def update_category(_):
-    df_lazy = get_df()
+def update_category(filters):
+    df_lazy = get_cube_df(filters)
     if df_lazy is None:
         return go.Figure(), [], []
-    df_cat = calculate_delay_pct(df_lazy).collect()
+    df_cat = calculate_delay_pct(df_lazy, filters)
     # figure
     fig = create_bar_figure(
         df_cat,
@@ -454,14 +455,13 @@ def update_category(_):
     Output(ID_TABLE_FLIGHT_DELAY, "data"),
     add_watcher_for_data(),
 )
-def update_interval(_):
-    df_lazy = get_df()
+def update_interval(filters):
+    df_lazy = get_cube_df(filters)
     if df_lazy is None:
         return go.Figure(), [], []
-    df = df_lazy.collect()
-    if df.is_empty():
+    df_period = calculate_period_distribution(df_lazy, filters)
+    if df_period.is_empty():
         return go.Figure(), [], []
-    df_period = calculate_period_distribution(df)
     # figure
     fig = create_bar_horizontal_figure(
         df_period,
@@ -483,15 +483,15 @@ def update_interval(_):
     Output(ID_TABLE_SUBTYPE_REG_PCT, "data"),
     add_watcher_for_data(),
 )
-def update_subtype_registration_pct(_):
-    df_lazy = get_df()
+def update_subtype_registration_pct(filters):
+    df_lazy = get_cube_df(filters)
     if df_lazy is None:
-        return [], None, [], []
+        return [], [], []
 
     # calculate (cached)
-    df_reg = calculate_subtype_registration_pct(df_lazy).collect()
+    df_reg = calculate_subtype_registration_pct(df_lazy, filters)
     if df_reg.is_empty():
-        return [], None, [], []
+        return [], [], []
 
     # ───── Navbar layout ─────
     navbar_layout = create_navbar(
@@ -520,13 +520,13 @@ def update_subtype_registration_pct(_):
     Output(ID_TABLE_SUBTYPE_AIRPORT_PCT, "data"),
     add_watcher_for_data(),
 )
-def update_subtype_airport_pct(_):
-    df_lazy = get_df()
+def update_subtype_airport_pct(filters):
+    df_lazy = get_cube_df(filters)
     if df_lazy is None:
         return [], [], []
 
     # calculate (cached)
-    df_air = calculate_subtype_airport_pct(df_lazy).collect()
+    df_air = calculate_subtype_airport_pct(df_lazy, filters)
     if df_air.is_empty():
         return [], [], []
 
@@ -577,7 +577,9 @@ for tbl, btn, name in [
 
 register_navbar_callback(
     id_prefix=ID_AIRPORT_SUBTYPE_TABS_RESULT,
-    get_df_fn=lambda: calculate_subtype_airport_pct(get_df()).collect(),
+    get_df_fn=lambda filters: calculate_subtype_airport_pct(
+        get_cube_df(filters), filters
+    ),
     tabs_col=COL_NAME_SUBTYPE,
     x=COL_NAME_WINDOW_TIME,
     x_max=COL_NAME_WINDOW_TIME_MAX,
@@ -592,7 +594,9 @@ register_navbar_callback(
 
 register_navbar_callback(
     id_prefix=ID_AIRPORT_REGISTRATIONS_TABS_RESULT,
-    get_df_fn=lambda: calculate_subtype_registration_pct(get_df()).collect(),
+    get_df_fn=lambda filters: calculate_subtype_registration_pct(
+        get_cube_df(filters), filters
+    ),
     tabs_col=COL_NAME_SUBTYPE,
     x=COL_NAME_WINDOW_TIME,
     x_max=COL_NAME_WINDOW_TIME_MAX,
@@ -153,10 +153,10 @@ add_export_callbacks(
     add_watcher_for_data(),
 )
 def create_layout(
-    _,
+    filters,
 ):
 
-    result = calculate_result()
+    result = calculate_result(filters)
 
     if result is None:
         return dash.no_update
@@ -95,8 +95,8 @@ layout = dbc.Container(
     Output(ID_WEEKLY_BARS, "figure"),
     add_watcher_for_data(),
 )
-def refresh_weekly_table(_):
-    df, days_cols = analyze_weekly_codes()
+def refresh_weekly_table(filters):
+    df, days_cols = analyze_weekly_codes(filters)
     percentage_col_names = [COL_NAME_DATE_PERCENTAGE.format(c=c) for c in days_cols]
     if df is None:
         return [], [], [], [], go.Figure()
@@ -22,6 +22,7 @@ from data_managers.excel_manager import (
     path_exists,
 )
 from data_managers.watcher_excel_dir import add_callbacks as add_watcher_excel
+from status.metrics_manager import add_callbacks as add_metrics_callbacks
 from components.filter import (
     ID_FILTER_CONTAINER,
     layout as filter_layout,
@@ -177,6 +178,7 @@ def update_page_and_navbar(pathname, _, pref, token, loaded_url):
 
 
 add_watcher_excel()
+add_metrics_callbacks()
 add_excel_manager_callbacks()
 add_filter_callbacks()
 add_auth_callbacks()
@@ -189,7 +191,6 @@ def start_server(start_dev=True):
 
 
 if __name__ == "__main__":
-
     config = get_base_config()
     log_file = config.get("log", {}).get("log_file_server", "dashboard_server.log")
 
@@ -1,6 +1,12 @@
-from typing import Literal
+from typing import Literal, Optional, TypedDict
 
 statusUser = Literal["unverified", "login"]
 
 
 StatusData = Literal["selected", "unselected"]
+
+
+class DatasetState(TypedDict):
+    version: Optional[str]
+    path: Optional[str]
+    modification_date: Optional[str]
@@ -0,0 +1,26 @@
+from datetime import date
+from typing import Optional, Union
+
+from pydantic import BaseModel
+
+
+class ColumnStats(BaseModel):
+    null_count: int
+    distinct_count: int
+    # sorted, without nulls, only kept for low cardinality key columns
+    distinct_values: Optional[list[Union[int, str]]] = None
+
+
+class FrameStats(BaseModel):
+    total_rows: int
+    min_date: Optional[date] = None
+    max_date: Optional[date] = None
+    columns: dict[str, ColumnStats]
+
+
+class DatasetStats(BaseModel):
+    """Statistics of the loaded dataset, valid for one dataset version."""
+
+    dataset_version: str
+    raw: FrameStats
+    unfiltered: FrameStats
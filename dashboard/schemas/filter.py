@@ -1,12 +1,14 @@
 from datetime import date
 from typing import Literal, Optional, TypedDict
 
+import polars as pl
+
 
 class FilterType(TypedDict, total=False):
     fl_segmentation: Optional[int]
     fl_unit_segmentation: str
     fl_subtypes: Optional[list[str]]
-    fl_code_delays: Optional[list[str]]
+    fl_code_delays: Optional[list[int]]
     fl_matricules: Optional[list[str]]
     dt_start: Optional[date]
     dt_end: Optional[date]
@@ -21,3 +23,11 @@ FilterKey = Literal[
     "dt_start",
     "dt_end",
 ]
+
+
+class FilteredResult(TypedDict):
+    """Collected frames of one filter, see data_managers.result_registry."""
+
+    df: pl.DataFrame
+    total_df: Optional[pl.DataFrame]
+    cube_df: pl.DataFrame
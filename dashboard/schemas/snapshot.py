@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+
+
+class SnapshotSource(BaseModel):
+    """Rows of one workbook snapshot currently held in memory."""
+
+    snapshot_key: str
+    rows: int
+    fingerprint: str
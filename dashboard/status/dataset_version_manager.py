@@ -0,0 +1,33 @@
+import hashlib
+import threading
+from typing import Optional
+
+from schemas.data_status import DatasetState
+
+dataset_state: DatasetState = {"version": None, "path": None, "modification_date": None}
+_dataset_state_lock = threading.Lock()
+
+
+def get_dataset_state() -> DatasetState:
+    with _dataset_state_lock:
+        return dict(dataset_state)
+
+
+def publish_dataset_state(
+    dataset_version: Optional[str], path: Optional[str], modification_date
+) -> bool:
+    global dataset_state
+
+    # the token only depends on the data itself so every worker agrees on it
+    raw_version = f"{path or ''}|{dataset_version or ''}"
+    version = hashlib.sha1(raw_version.encode("utf-8")).hexdigest()[:16]
+
+    with _dataset_state_lock:
+        changed = version != dataset_state["version"]
+        dataset_state = {
+            "version": version,
+            "path": path,
+            "modification_date": modification_date,
+        }
+    return changed
+
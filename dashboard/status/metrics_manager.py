@@ -0,0 +1,105 @@
+import time
+
+from flask import Response, g, request
+
+from data_managers.cache_manager import (
+    get_cache_epoch,
+    get_redis_server,
+    l1_cache,
+)
+from data_managers.cache_warmer import get_warmer_progress
+from data_managers.excel_manager import get_cube_df_unfiltered, get_dataset_stats
+from data_managers.result_registry import result_registry
+from server_instance import get_server
+from utils_dashboard.utils_metrics import (
+    GaugeMetric,
+    HistogramMetric,
+    render_metrics,
+)
+
+ROUTE_METRICS = "/metrics"
+ROUTE_DASH_UPDATE = "/_dash-update-component"
+
+server = get_server()
+
+callback_seconds_metric = HistogramMetric(
+    "dashboard_callback_seconds",
+    "Time spent serving a Dash callback, per output.",
+    ("output",),
+)
+dataset_rows_metric = GaugeMetric(
+    "dashboard_dataset_rows",
+    "Rows of the loaded frames.",
+    ("frame",),
+)
+local_cache_bytes_metric = GaugeMetric(
+    "dashboard_local_cache_bytes", "Bytes held by the in process cache."
+)
+local_cache_entries_metric = GaugeMetric(
+    "dashboard_local_cache_entries", "Entries of the in process cache."
+)
+registry_bytes_metric = GaugeMetric(
+    "dashboard_result_registry_bytes", "Bytes held by the filtered frames registry."
+)
+registry_entries_metric = GaugeMetric(
+    "dashboard_result_registry_entries", "Entries of the filtered frames registry."
+)
+redis_connected_metric = GaugeMetric(
+    "dashboard_redis_connected", "1 when this worker is connected to Redis."
+)
+cache_epoch_metric = GaugeMetric(
+    "dashboard_cache_epoch", "Namespace epoch of the calculation cache."
+)
+warmer_tasks_metric = GaugeMetric(
+    "dashboard_cache_warmer_tasks",
+    "Tasks of the last cache warmer pass.",
+    ("state",),
+)
+
+
+def update_gauges() -> None:
+    # read on scrape, the request path never pays for them
+    dataset_stats = get_dataset_stats()
+    if dataset_stats is not None:
+        dataset_rows_metric.set(dataset_stats.raw.total_rows, frame="raw")
+        dataset_rows_metric.set(dataset_stats.unfiltered.total_rows, frame="unfiltered")
+    df_cube = get_cube_df_unfiltered()
+    dataset_rows_metric.set(df_cube.height if df_cube is not None else 0, frame="cube")
+
+    local_usage = l1_cache.get_usage()
+    local_cache_bytes_metric.set(local_usage["bytes"])
+    local_cache_entries_metric.set(local_usage["entries"])
+
+    registry_usage = result_registry.get_usage()
+    registry_bytes_metric.set(registry_usage["bytes"])
+    registry_entries_metric.set(registry_usage["entries"])
+
+    redis_connected_metric.set(int(get_redis_server() is not None))
+    cache_epoch_metric.set(get_cache_epoch())
+
+    warmer_progress = get_warmer_progress()
+    for state in ("total", "done", "failed"):
+        warmer_tasks_metric.set(warmer_progress.get(state, 0), state=state)
+
+
+def add_callbacks():
+
+    @server.before_request
+    def start_callback_timer():
+        if request.path == ROUTE_DASH_UPDATE:
+            g.callback_started_at = time.perf_counter()
+
+    @server.after_request
+    def record_callback_time(response):
+        started_at = g.pop("callback_started_at", None)
+        if started_at is not None:
+            body = request.get_json(silent=True) or {}
+            callback_seconds_metric.observe(
+                time.perf_counter() - started_at, output=body.get("output", "")
+            )
+        return response
+
+    @server.route(ROUTE_METRICS)
+    def metrics():
+        update_gauges()
+        return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
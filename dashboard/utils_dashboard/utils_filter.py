@@ -1,43 +1,23 @@
 # filter_state.py
 
-from datetime import datetime
 import logging
-from data_managers.excel_manager import get_min_max_date_raw_df
 from schemas.filter import FilterType
+from utils_dashboard.utils_fingerprint import (
+    canonicalize_filters,
+    get_filter_fingerprint,
+)
 
 filter_name = ""
 filter_list = []
-date_min, date_max = None, None
 
 
 def load_filtering():
     logging.info("Loading filter file...")
 
 
-def get_date_range() -> tuple:
-    global date_min, date_max
-
-    global_date_min, global_date_max = get_min_max_date_raw_df()
-    if date_min is None:
-        logging.info("Date min is not set.")
-        date_min_to_send = global_date_min
-    else:
-        date_min_to_send = datetime.strptime(date_min, "%Y-%m-%d").date()
-
-    if date_max is None:
-        logging.info("Date max is not set.")
-
-        date_max_to_send = global_date_max
-
-    else:
-        date_max_to_send = datetime.strptime(date_max, "%Y-%m-%d").date()
-
-    return date_min_to_send, date_max_to_send
-
-
-def set_name_from_filter(filters: FilterType) -> None:
-    global filter_name, filter_list, date_min, date_max
-    logging.info("Starting to generate filter name from filters: %s", filters)
+def build_filter_list(filters: FilterType) -> list[str]:
+    logging.debug("Building filter list from filters: %s", filters)
+    filters = canonicalize_filters(filters)
 
     start = filters.get("dt_start") or ""
     end = filters.get("dt_end") or ""
@@ -47,11 +27,6 @@ def set_name_from_filter(filters: FilterType) -> None:
     matricules = filters.get("fl_matricules") or []
     segmentation_unit = filters.get("fl_unit_segmentation") or "d"
 
-    date_min, date_max = (
-        filters.get("dt_start"),
-        filters.get("dt_end"),
-    )
-
     logging.debug(
         "Extracted values: start=%s, end=%s, seg=%s, unit=%s | subtypes=%s, code_delays=%s, matricules=%s",
         start,
@@ -110,7 +85,19 @@ def set_name_from_filter(filters: FilterType) -> None:
     else:
         logging.debug("No matricules provided, adding 'all_matricules'")
         filter_list.append("all_matricules")
-    filter_name = "_".join(filter_list)
+    return filter_list
+
+
+def set_name_from_filter(filters: FilterType) -> None:
+    global filter_name, filter_list
+    logging.info("Starting to generate filter name from filters: %s", filters)
+
+    filter_list = build_filter_list(filters)
+    # the dates stay readable, the selections are carried by the fingerprint
+    date_parts = [part for part in filter_list if part.startswith(("from_", "to_"))]
+    filter_name = "_".join(
+        [*(date_parts or ["all_dates"]), get_filter_fingerprint(filters)]
+    )
     logging.debug(f"Filter list generated: {filter_list}")
     logging.info(f"Generated filter name: {filter_name}")
 
@@ -0,0 +1,60 @@
+from datetime import date, datetime
+import hashlib
+import json
+import logging
+from typing import Optional
+
+from schemas.filter import FilterType
+
+DEFAULT_UNIT_SEGMENTATION = "d"
+
+LIST_FILTER_KEYS = ("fl_subtypes", "fl_code_delays", "fl_matricules")
+# matched against the integer DELAY_CODE column, kept as ints
+INT_LIST_FILTER_KEYS = ("fl_code_delays",)
+DATE_FILTER_KEYS = ("dt_start", "dt_end")
+
+
+def normalize_filter_date(value) -> Optional[str]:
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    # the data is filtered per day, any time part is ignored
+    return datetime.fromisoformat(str(value)).date().isoformat()
+
+
+def canonicalize_filters(filters: Optional[FilterType]) -> FilterType:
+    """Same canonical form for filters that select the same data."""
+    filters = filters or {}
+    canonical: FilterType = {}
+
+    for key in DATE_FILTER_KEYS:
+        value = normalize_filter_date(filters.get(key))
+        if value:
+            canonical[key] = value
+
+    segmentation = filters.get("fl_segmentation")
+    if segmentation:
+        canonical["fl_segmentation"] = int(segmentation)
+        # the unit is only read together with a segmentation
+        canonical["fl_unit_segmentation"] = (
+            filters.get("fl_unit_segmentation") or DEFAULT_UNIT_SEGMENTATION
+        )
+
+    for key in LIST_FILTER_KEYS:
+        values = filters.get(key)
+        if values:
+            cast = int if key in INT_LIST_FILTER_KEYS else str
+            canonical[key] = sorted({cast(value) for value in values})
+
+    return canonical
+
+
+def get_filter_fingerprint(filters: Optional[FilterType]) -> str:
+    canonical = canonicalize_filters(filters)
+    raw = json.dumps(canonical, sort_keys=True, separators=(",", ":"))
+    fingerprint = hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+    logging.debug(f"Filter fingerprint {fingerprint} for {raw}")
+    return fingerprint
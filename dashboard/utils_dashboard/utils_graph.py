@@ -450,7 +450,7 @@ def create_navbar(df: pl.DataFrame, tabs_col: str, id_prefix: str):
 # ───── Callback registration ─────
 def register_navbar_callback(
     id_prefix: str,
-    get_df_fn,  # function returning a polars DataFrame
+    get_df_fn,  # function of the filters returning a polars DataFrame
     tabs_col: str,
     x: str,
     y: str,
@@ -472,11 +472,11 @@ def register_navbar_callback(
         Input(tabs_id, "value", True),
         add_watcher_for_data(),
     )
-    def update_graph(selected_fam, _):
+    def update_graph(selected_fam, filters):
         if selected_fam is None:
             return {}
 
-        df = get_df_fn()  # get the latest df
+        df = get_df_fn(filters)  # get the df of the user's filters
         fam_data = df.filter(pl.col(tabs_col) == selected_fam)
 
         return create_bar_figure(
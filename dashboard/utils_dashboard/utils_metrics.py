@@ -0,0 +1,128 @@
+from bisect import bisect_left
+import math
+import threading
+from typing import Iterable, Optional
+
+# seconds, from a local cache hit up to a cold scan of the whole dataset
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+metric_families: list["MetricFamily"] = []
+
+
+def escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(label_names: Iterable[str], label_values: Iterable[str]) -> str:
+    pairs = [
+        f'{name}="{escape_label_value(str(value))}"'
+        for name, value in zip(label_names, label_values)
+    ]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class MetricFamily:
+    """One metric name, its help line and a value per label set."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+
+        self._lock = threading.Lock()
+        self._values: dict[tuple, object] = {}
+
+        metric_families.append(self)
+
+    def get_label_values(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def render_samples(self) -> list[str]:
+        with self._lock:
+            return [
+                f"{self.name}{format_labels(self.label_names, label_values)} "
+                f"{format_value(value)}"
+                for label_values, value in self._values.items()
+            ]
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+            *self.render_samples(),
+        ]
+        return "\n".join(lines)
+
+
+class CounterMetric(MetricFamily):
+    kind = "counter"
+
+    def inc(self, value: float = 1, **labels) -> None:
+        key = self.get_label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+
+class GaugeMetric(MetricFamily):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = self.get_label_values(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class HistogramMetric(MetricFamily):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple = (),
+        buckets: Optional[tuple] = None,
+    ):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(buckets or DEFAULT_BUCKETS)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self.get_label_values(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            # counts per bucket, the cumulative sums are built on render
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    def render_samples(self) -> list[str]:
+        lines = []
+        with self._lock:
+            values = [
+                (key, list(counts), total)
+                for key, (counts, total) in self._values.items()
+            ]
+
+        for label_values, counts, total in values:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                labels = format_labels(
+                    (*self.label_names, "le"), (*label_values, format_value(bound))
+                )
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = format_labels(self.label_names, label_values)
+            lines.append(f"{self.name}_sum{labels} {format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+def render_metrics() -> str:
+    return "\n".join(family.render() for family in metric_families) + "\n"
@@ -1,3 +1,4 @@
 cd dashboard
 
-poetry run waitress-serve --listen=*:8000 root:server
\ No newline at end of file
+# 16 threads, as gunicorn.conf.py, waitress defaults to 4
+poetry run waitress-serve --listen=*:8000 --threads=16 root:server
\ No newline at end of file